@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+benchmark_connectfour.py
+
+Brief: Measures the time and peak memory of generating Connect Four models.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import sys
+import time
+from humanfriendly import tables
+import connectfour
+
+default_sizes = [(5, 4), (6, 5), (7, 6), (9, 8), (12, 10), (16, 14), (20, 18)]
+
+
+class CountingStream:
+    """
+    Output stream that only counts the number of bytes written to it.
+    """
+    def __init__(self):
+        self.size = 0
+
+    def write(self, s):
+        self.size += len(s)
+
+
+def measure(N, M, K):
+    """
+    Generates a model in a child process. Returns the wall clock time,
+    the size of the model in bytes and the peak resident memory in kilobytes.
+    """
+    (read_fd, write_fd) = os.pipe()
+    start = time.time()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        out = CountingStream()
+        connectfour.write_model(out, N, M, K)
+        os.write(write_fd, str(out.size))
+        os._exit(0)
+    os.close(write_fd)
+    (pid, status, rusage) = os.wait4(pid, 0)
+    end = time.time()
+    size = int(os.read(read_fd, 64))
+    os.close(read_fd)
+    return (end - start, size, rusage.ru_maxrss)
+
+
+def usage():
+    command = os.path.basename(sys.argv[0])
+    return """Usage: {0} [K [NxM ...]]
+Generates Connect Four models with win length K (default: 4) for the given
+board sizes and reports generation time and peak memory.""".format(command)
+
+
+def main():
+    K = connectfour.K
+    sizes = default_sizes
+    try:
+        if len(sys.argv) > 1:
+            K = int(sys.argv[1])
+        if len(sys.argv) > 2:
+            sizes = [tuple(int(x) for x in arg.split('x')) for arg in sys.argv[2:]]
+    except ValueError:
+        print >> sys.stderr, usage()
+        sys.exit(1)
+
+    # memory of a child process that does not generate anything
+    (t, size, baseline) = measure(1, 1, 1)
+    rows = []
+    for (N, M) in sizes:
+        if N < K:
+            print >> sys.stderr, 'Skipping {}x{}: the board is narrower than K.'.format(N, M)
+            continue
+        print >> sys.stderr, 'Generating {}x{} (K = {}) ...'.format(N, M, K)
+        (t, size, max_rss) = measure(N, M, K)
+        rows.append([N, M, K, '{:.2f}'.format(t), '{:.2f}'.format(size / 1048576.0),
+                     '{:.2f}'.format(max_rss / 1024.0), '{:.2f}'.format((max_rss - baseline) / 1024.0)])
+    column_names = ['N', 'M', 'K', 'seconds', 'size (MB)', 'max rss (MB)', 'increase (MB)']
+    print(tables.format_pretty_table(rows, column_names))
+
+
+if __name__ == '__main__':
+    main()
@@ -17,168 +17,168 @@ N = 7  # width of the board
 M = 6  # height of the board
 K = 4  # number of pieces needed to win
 
-if len(sys.argv) > 1:
-    N = int(sys.argv[1])
-    if len(sys.argv) > 2:
-        M = int(sys.argv[2])
-if N < K or M < 1:
-    print "Usage: connectfour [N [M]] (for N >= {K}, M >= 1)".format(K)
-    sys.exit()
 
-smv_template = '''-- Connect Four {N} x {M}
+def write_wins(out, N, M, K, colour):
+    """
+    Writes the condition that colour has K pieces in a row.
+    """
+    if N >= K:
+        out.write("-- Horizontal\n        ")
+        for j in range(1, M + 1):
+            for i in range(1, N + 2 - K):
+                out.write("(")
+                for x in range(0, K):
+                    out.write("board[{}][{}] = {} & ".format(i + x, j, colour))
+                out.write("TRUE )\n      | ")
+    if M >= K:
+        out.write("\n      -- Vertical\n        ")
+        for i in range(1, N + 1):
+            for j in range(1, M + 2 - K):
+                out.write("(")
+                for x in range(0, K):
+                    out.write("board[{}][{}] = {} & ".format(i, j + x, colour))
+                out.write("TRUE )\n      | ")
+    if N >= K and M >= K:
+        out.write("\n      -- Diagonal\n        ")
+        for i in range(1, N + 2 - K):
+            for j in range(1, M + 2 - K):
+                out.write("(")
+                for x in range(0, K):
+                    out.write("board[{}][{}] = {} & ".format(i + x, j + x, colour))
+                out.write("TRUE )\n      | ")
+        for i in range(1, N + 2 - K):
+            for j in range(1, M + 2 - K):
+                out.write("(")
+                for x in range(0, K):
+                    out.write("board[{}][{}] = {} & ".format(N + 1 - i - x, j + x, colour))
+                out.write("TRUE )\n      | ")
+    out.write("FALSE;")
+
+
+def write_strategy(out, N, M, colour, opponent):
+    """
+    Writes the property that colour has a winning strategy.
+    """
+    k = (N * M / 2) + 1
+    for i in range(1, k + 1):
+        out.write("EX ({}wins".format(colour))
+        if i < k:
+            out.write(" | AX (!{}wins & ".format(opponent))
+    for i in range(1, k + 1):
+        if i < k:
+            out.write(") ")
+        out.write(") ")
+
+
+def write_spec(out, N, M):
+    out.write('''AG !(redwins & yellowwins)
+  SPEC
+    ''')
+    write_strategy(out, N, M, 'yellow', 'red')
+    out.write('''
+  SPEC
+    ''')
+    write_strategy(out, N, M, 'red', 'yellow')
 
-MODULE main
-  VAR
-    player     : {{Yellow, Red}};
-    board      : array 1..{N} of array 1..{M} of {{None, Yellow, Red}};
 
-  DEFINE
-    yellowwins :=
-      {yellowwins}
-    redwins :=
-      {redwins}
+def write_init(out, N, M):
+    out.write('''player = Yellow &
+''')
+    for i in range(1, N + 1):
+        for j in range(1, M + 1):
+            out.write("    board[{}][{}] = None &\n".format(i, j))
+    out.write("    TRUE")
 
-  SPEC
-    {spec}
 
-  INIT
-    {init}
-
-  TRANS
-    {trans}
-'''
-
-yellowwins = ""
-redwins = ""
-if N >= K:
-    yellowwins += "-- Horizontal\n        "
-    redwins += "-- Horizontal\n        "
-    for j in range(1, M + 1):
-        for i in range(1, N + 2 - K):
-            yellowwins += "("
-            redwins += "("
-            for x in range(0, K):
-                yellowwins += "board[{}][{}] = Yellow & ".format(i + x, j)
-                redwins += "board[{}][{}] = Red & ".format(i + x, j)
-            yellowwins += "TRUE )\n      | "
-            redwins += "TRUE )\n      | "
-if M >= K:
-    yellowwins += "\n      -- Vertical\n        "
-    redwins += "\n      -- Vertical\n        "
+def write_trans(out, N, M):
+    out.write("(\n")
     for i in range(1, N + 1):
-        for j in range(1, M + 2 - K):
-            yellowwins += "("
-            redwins += "("
-            for x in range(0, K):
-                yellowwins += "board[{}][{}] = Yellow & ".format(i, j + x)
-                redwins += "board[{}][{}] = Red & ".format(i, j + x)
-            yellowwins += "TRUE )\n      | "
-            redwins += "TRUE )\n      | "
-if N >= K and M >= K:
-    yellowwins += "\n      -- Diagonal\n        "
-    redwins += "\n      -- Diagonal\n        "
-    for i in range(1, N + 2 - K):
-        for j in range(1, M + 2 - K):
-            yellowwins += "("
-            redwins += "("
-            for x in range(0, K):
-                yellowwins += "board[{}][{}] = Yellow & ".format(i + x, j + x)
-                redwins += "board[{}][{}] = Red & ".format(i + x, j + x)
-            yellowwins += "TRUE )\n      | "
-            redwins += "TRUE )\n      | "
-    for i in range(1, N + 2 - K):
-        for j in range(1, M + 2 - K):
-            yellowwins += "("
-            redwins += "("
-            for x in range(0, K):
-                yellowwins += "board[{}][{}] = Yellow & ".format(N + 1 - i - x, j + x)
-                redwins += "board[{}][{}] = Red & ".format(N + 1 - i - x, j + x)
-            yellowwins += "TRUE )\n      | "
-            redwins += "TRUE )\n      | "
-
-yellowwins += "FALSE;"
-redwins += "FALSE;"
-
-spec = '''AG !(redwins & yellowwins)
-  SPEC
-    '''
-k = (N * M / 2) + 1
-for i in range(1, k + 1):
-    spec += "EX (yellowwins"
-    if i < k:
-        spec += " | AX (!redwins & "
-for i in range(1, k + 1):
-    if i < k:
-        spec += ") "
-    spec += ") "
-spec += '''
-  SPEC
-    '''
-for i in range(1, k + 1):
-    spec += "EX (redwins"
-    if i < k:
-        spec += " | AX (!yellowwins & "
-for i in range(1, k + 1):
-    if i < k:
-        spec += ") "
-    spec += ") "
-
-init = '''player = Yellow &
-'''
-for i in range(1, N + 1):
-    for j in range(1, M + 1):
-        init += "    board[{}][{}] = None &\n".format(i, j)
-init += "    TRUE"
-
-trans = "(\n"
-# trans = '''!yellowwins & !redwins &
-#    next(player) = case player = Yellow : Red;
-#                        TRUE : Yellow;
-#                   esac &
-#    (
-# '''
-for i in range(1, N + 1):
-    trans += '''      (
+        out.write('''      (
         !yellowwins & !redwins &
         next(player) = case player = Yellow : Red;
                             TRUE : Yellow;
                        esac &
         (board[{}][{}] = None) &
         (
-'''.format(i, M)
-    #  trans += "      ( (board[{}][{}] = None) & \n        (\n".format(i, M)
-    for j in range(1, M + 1):
-        trans += "          next(board[{}][{}]) = case ".format(i, j)
-        if (j > 1):
+'''.format(i, M))
+        for j in range(1, M + 1):
+            out.write("          next(board[{}][{}]) = case ".format(i, j))
             for k in range(1, j):
-                trans += "board[{}][{}] != None & ".format(i, k)
-        trans += "board[{}][{}] = None\n".format(i, j)
-        trans += '''                                        : player;
+                out.write("board[{}][{}] != None & ".format(i, k))
+            out.write("board[{}][{}] = None\n".format(i, j))
+            out.write('''                                        : player;
                                    TRUE : board[{}][{}];
                               esac &
-'''.format(i, j)
+'''.format(i, j))
+        for x in range(1, N + 1):
+            if x != i:
+                for y in range(1, M + 1):
+                    out.write("          next(board[{}][{}]) = board[{}][{}] &\n".format(x, y, x, y))
+        out.write("          TRUE \n        )\n      ) | \n")
+
+    out.write("      ( (yellowwins | redwins | (")
+    for i in range(1, N + 1):
+        out.write("board[{}][{}] != None & ".format(i, M))
+    out.write("TRUE) ) & \n        (\n")
     for x in range(1, N + 1):
-        if x != i:
-            for y in range(1, M + 1):
-                trans += "          next(board[{}][{}]) = board[{}][{}] &\n".format(x, y, x, y)
-    trans += "          TRUE \n        )\n      ) | \n"
-
-trans += "      ( (yellowwins | redwins | ("
-for i in range(1, N + 1):
-    trans += "board[{}][{}] != None & ".format(i, M)
-trans += "TRUE) ) & \n        (\n"
-for x in range(1, N + 1):
-    for y in range(1, M + 1):
-        trans += "          next(board[{}][{}]) = board[{}][{}] &\n".format(x, y, x, y)
-trans += "          TRUE \n        )\n      )\n    )"
-
-arguments = {'N': N,
-             'M': M,
-             'yellowwins': yellowwins,
-             'redwins': redwins,
-             'spec': spec,
-             'init': init,
-             'trans': trans
-             }
-smv = smv_template.format(**arguments)
-print smv
+        for y in range(1, M + 1):
+            out.write("          next(board[{}][{}]) = board[{}][{}] &\n".format(x, y, x, y))
+    out.write("          TRUE \n        )\n      )\n    )")
+
+
+def write_model(out, N, M, K):
+    """
+    Writes the SMV model section by section, without keeping
+    the model in memory.
+    """
+    out.write('''-- Connect Four {N} x {M}
+
+MODULE main
+  VAR
+    player     : {{Yellow, Red}};
+    board      : array 1..{N} of array 1..{M} of {{None, Yellow, Red}};
+
+  DEFINE
+    yellowwins :=
+      '''.format(N = N, M = M))
+    write_wins(out, N, M, K, 'Yellow')
+    out.write('''
+    redwins :=
+      ''')
+    write_wins(out, N, M, K, 'Red')
+    out.write('''
+
+  SPEC
+    ''')
+    write_spec(out, N, M)
+    out.write('''
+
+  INIT
+    ''')
+    write_init(out, N, M)
+    out.write('''
+
+  TRANS
+    ''')
+    write_trans(out, N, M)
+    out.write('''
+
+''')
+
+
+def main():
+    global N, M, K
+    if len(sys.argv) > 1:
+        N = int(sys.argv[1])
+        if len(sys.argv) > 2:
+            M = int(sys.argv[2])
+            if len(sys.argv) > 3:
+                K = int(sys.argv[3])
+    if K < 1 or N < K or M < 1:
+        print >> sys.stderr, "Usage: connectfour [N [M [K]]] (for K >= 1, N >= K, M >= 1)"
+        sys.exit(1)
+    write_model(sys.stdout, N, M, K)
+
+
+if __name__ == '__main__':
+    main()
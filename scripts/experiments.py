@@ -20,15 +20,19 @@ from tools import *
 """
 Generate files required for the experiments.
 """
-def prepare_experiments(config, experiments):
+def prepare_experiments(config, experiments, max_workers):
     tools = ToolRegistry(config).tools
+    supported = []
     for experiment in experiments:
         experiment_type = experiment['type']
-        if (experiment_type == 'pbes'):
-            mcrl2 = tools['mcrl2']
-            mcrl2.prepare(experiment)
+        if experiment_type in ['lps', 'pbes']:
+            supported.append(experiment)
         else:
             print >> sys.stderr, 'Type not supported:', experiment_type
+    if max_workers is None:
+        max_workers = config.get('max_cores')
+    mcrl2 = tools['mcrl2']
+    mcrl2.prepare_all(supported, max_workers)
 
 """
 List the experiments.
@@ -46,13 +50,110 @@ def run_experiment(config, experiments, index):
     ltsmin = tools['ltsmin']
     ltsmin.run(experiments, index)
 
+"""
+Run all experiments repeatedly, in parallel within the core budget.
+"""
+def run_all_experiments(config, experiments, repetitions, max_cores):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    if max_cores is None:
+        max_cores = config.get('max_cores')
+    ltsmin.run_all(experiments, repetitions, max_cores)
+
+"""
+Repeat the experiments until their mean times are known precisely enough.
+"""
+def run_adaptive_experiments(config, experiments, max_cores):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    if max_cores is None:
+        max_cores = config.get('max_cores')
+    ltsmin.run_adaptive(experiments, max_cores)
+
+"""
+Resume an interrupted campaign.
+"""
+def resume_experiments(config, experiments, max_cores):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    if max_cores is None:
+        max_cores = config.get('max_cores')
+    ltsmin.resume(experiments, max_cores)
+
+"""
+Add all runs to the work queue.
+"""
+def enqueue_experiments(config, experiments, repetitions):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.enqueue(experiments, repetitions)
+
+"""
+Execute runs from the work queue.
+"""
+def work_on_queue(config, experiments, max_cores):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    if max_cores is None:
+        max_cores = config.get('max_cores')
+    ltsmin.work(experiments, max_cores)
+
+"""
+Show the status of the work queue.
+"""
+def print_queue(config, experiments):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.print_queue()
+
+"""
+Publish the status of the active runs.
+"""
+def monitor_runs(config, experiments, port):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.monitor(port)
+
 """
 Analyse the results.
 """
-def analyse_results(config, experiments):
+def analyse_results(config, experiments, output_filename):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.analyse(experiments, output_filename)
+
+"""
+Compare the results of two toolchain versions or run directories.
+Returns the number of significant slowdowns.
+"""
+def compare_results(config, experiments, baseline, candidate, output_filename):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    return ltsmin.compare(experiments, baseline, candidate, output_filename)
+
+"""
+Add existing run directories to the results index.
+"""
+def index_results(config, experiments):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.update_index(experiments)
+
+"""
+Compress and evict bulky files of finished runs.
+"""
+def compact_runs(config, experiments):
     tools = ToolRegistry(config).tools
     ltsmin = tools['ltsmin']
-    ltsmin.analyse(experiments)
+    ltsmin.compact(experiments)
+
+"""
+Fit the growth of time and memory to the size of the experiments.
+"""
+def fit_results(config, experiments, time_budget, memory_budget):
+    tools = ToolRegistry(config).tools
+    ltsmin = tools['ltsmin']
+    ltsmin.fit(experiments, time_budget, memory_budget)
 
 """
 Read experiment data from a JSON file.
@@ -72,8 +173,39 @@ def read_config(json_filename):
 
 def usage():
     command = os.path.basename(sys.argv[0])
-    return """Usage: {0} <config.json> <experiments.json> <prepare|list|run|analyse> [index]
-For the command 'run', the [index] option is required.""".format(command)
+    return """Usage: {0} <config.json> <experiments.json> <prepare|list|run|run-all|run-adaptive|resume|enqueue|worker|queue|monitor|index|compact|analyse|compare|fit> [index]
+For the command 'run', the [index] option is required.
+The command 'prepare' takes the optional argument [max_workers]
+(default: the 'max_cores' setting in the config file or the number of
+cores of the machine).
+The command 'run-all' takes the optional arguments [repetitions [max_cores]]
+(defaults: 1 repetition, the 'max_cores' setting in the config file or
+the number of cores of the machine).
+The command 'run-adaptive' takes the optional argument [max_cores] and
+repeats runs until the 'repetition' policy in the config file is met.
+The command 'resume' takes the optional argument [max_cores]; it quarantines
+partial run directories and executes the repetitions that are missing from
+the last 'run-all' or 'enqueue'.
+The command 'enqueue' adds all runs [repetitions] times (default: 1) to the
+work queue; 'worker' executes runs from the queue within [max_cores] until
+the queue is drained and can be started on several machines; 'queue' shows
+the state of the queue.
+The command 'monitor' writes the status of the active runs to a JSON file
+(see the 'status' section in the config file) until interrupted, and
+serves it on localhost if the optional argument [port] is given.
+The command 'compact' compresses, deduplicates and evicts files of finished
+runs according to the 'runs_storage' section in the config file.
+The command 'analyse' takes the optional argument [output], a CSV file
+(or a JSON file, if it ends with '.json') for the speedups.
+The command 'compare' takes the arguments <baseline> <candidate> [output];
+each selects a result set: a directory with the layout of the runs
+directory, or the runs of which a program path or version contains the
+given text. It reports the differences in run time per run and action and
+exits with status 2 if the candidate is significantly slower for any run.
+The command 'fit' takes the optional arguments [time_budget [memory_budget]]
+in seconds and megabytes (defaults: the 'timeout' run option of the
+experiments or the 'timeout' setting in the config file, and the memory of
+the machine); it requires an experiments file generated by scaling.py.""".format(command)
 
 
 def main():
@@ -100,12 +232,75 @@ def main():
             sys.exit(1)
         index = int(sys.argv[4])
         run_experiment(config, experiments, index)
+    elif action == 'run-all':
+        repetitions = 1
+        max_cores = None
+        if len(sys.argv) > 4:
+            repetitions = int(sys.argv[4])
+        if len(sys.argv) > 5:
+            max_cores = int(sys.argv[5])
+        run_all_experiments(config, experiments, repetitions, max_cores)
+    elif action == 'run-adaptive':
+        max_cores = None
+        if len(sys.argv) > 4:
+            max_cores = int(sys.argv[4])
+        run_adaptive_experiments(config, experiments, max_cores)
+    elif action == 'resume':
+        max_cores = None
+        if len(sys.argv) > 4:
+            max_cores = int(sys.argv[4])
+        resume_experiments(config, experiments, max_cores)
+    elif action == 'enqueue':
+        repetitions = 1
+        if len(sys.argv) > 4:
+            repetitions = int(sys.argv[4])
+        enqueue_experiments(config, experiments, repetitions)
+    elif action == 'worker':
+        max_cores = None
+        if len(sys.argv) > 4:
+            max_cores = int(sys.argv[4])
+        work_on_queue(config, experiments, max_cores)
+    elif action == 'queue':
+        print_queue(config, experiments)
+    elif action == 'monitor':
+        port = None
+        if len(sys.argv) > 4:
+            port = int(sys.argv[4])
+        monitor_runs(config, experiments, port)
     elif action == 'list':
         list_experiments(config, experiments)
     elif action == 'prepare':
-        prepare_experiments(config, experiments)
+        max_workers = None
+        if len(sys.argv) > 4:
+            max_workers = int(sys.argv[4])
+        prepare_experiments(config, experiments, max_workers)
+    elif action == 'index':
+        index_results(config, experiments)
+    elif action == 'compact':
+        compact_runs(config, experiments)
     elif action == 'analyse':
-        analyse_results(config, experiments)
+        output_filename = None
+        if len(sys.argv) > 4:
+            output_filename = sys.argv[4]
+        analyse_results(config, experiments, output_filename)
+    elif action == 'compare':
+        if len(sys.argv) <= 5:
+            print >> sys.stderr, usage()
+            sys.exit(1)
+        output_filename = None
+        if len(sys.argv) > 6:
+            output_filename = sys.argv[6]
+        slowdowns = compare_results(config, experiments, sys.argv[4], sys.argv[5], output_filename)
+        if slowdowns > 0:
+            sys.exit(2)
+    elif action == 'fit':
+        time_budget = None
+        memory_budget = None
+        if len(sys.argv) > 4:
+            time_budget = float(sys.argv[4])
+        if len(sys.argv) > 5:
+            memory_budget = float(sys.argv[5])
+        fit_results(config, experiments, time_budget, memory_budget)
     else:
         print >> sys.stderr, usage()
         sys.exit(1)
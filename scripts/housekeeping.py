@@ -0,0 +1,209 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+housekeeping.py
+
+Brief: Compresses, deduplicates and evicts bulky files of finished runs
+to keep the runs directory within a disk quota.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import fcntl
+import fnmatch
+import gzip
+import hashlib
+import sys
+import tempfile
+from contextlib import contextmanager
+
+chunk_size = 1024 * 1024
+
+# only these files are compressed or evicted; the results, metrics and
+# other small files of a run are never touched
+bulky_patterns = ['*.spg', '*.log', '*.spg.gz', '*.log.gz']
+
+
+def is_bulky(filename):
+    return any(fnmatch.fnmatch(os.path.basename(filename), pattern) for pattern in bulky_patterns)
+
+
+def compress_file(filename):
+    """
+    Compresses a file with gzip, streaming it in chunks. Replaces the
+    file by filename.gz and returns the new name and the SHA-256 checksum
+    of the uncompressed contents.
+    """
+    checksum = hashlib.sha256()
+    compressed = filename + '.gz'
+    (fd, tmp) = tempfile.mkstemp(prefix='.compress', dir=os.path.dirname(filename))
+    os.close(fd)
+    try:
+        with open(filename, 'rb') as f:
+            out = gzip.open(tmp, 'wb')
+            try:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    checksum.update(chunk)
+                    out.write(chunk)
+            finally:
+                out.close()
+        os.rename(tmp, compressed)
+    except:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+    os.remove(filename)
+    return (compressed, checksum.hexdigest())
+
+
+def get_last_use(stat):
+    return max(stat.st_atime, stat.st_mtime)
+
+
+class RunStorage:
+    """
+    Post-processes the directories of finished runs: bulky files larger than
+    'min_size' megabytes are compressed, and compressed parity games with the
+    same contents are replaced by hard links to a single copy in the pool.
+    If the runs directory exceeds 'quota' megabytes, the least recently used
+    bulky files are removed until it fits.
+    """
+    def __init__(self, options, runs_dir = 'runs'):
+        self.runs_dir = runs_dir
+        self.compress = options.get('compress', True)
+        self.dedup = options.get('dedup', True)
+        self.min_size = options.get('min_size', 1) * 1024 * 1024
+        quota = options.get('quota')
+        self.quota = None if quota is None else quota * 1024 * 1024
+        self.pool_dir = os.path.join(runs_dir, '.pool')
+
+    @contextmanager
+    def locked(self):
+        """
+        Prevents concurrent runs from compacting or evicting at the same time.
+        """
+        if not os.path.isdir(self.runs_dir):
+            os.makedirs(self.runs_dir)
+        with open(os.path.join(self.runs_dir, '.housekeeping.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def deduplicate(self, filename, checksum):
+        """
+        Replaces the file by a hard link to the copy in the pool with the
+        same contents, or adds the file to the pool.
+        """
+        pooled = os.path.join(self.pool_dir, checksum[:2], checksum + '.spg.gz')
+        if os.path.isfile(pooled):
+            os.remove(filename)
+            os.link(pooled, filename)
+            return True
+        directory = os.path.dirname(pooled)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        os.link(filename, pooled)
+        return False
+
+    def compact(self, run_dir):
+        """
+        Compresses and deduplicates the bulky files of a finished run.
+        Returns the number of bytes saved.
+        """
+        saved = 0
+        if not self.compress:
+            return saved
+        for name in sorted(os.listdir(run_dir)):
+            filename = os.path.join(run_dir, name)
+            if os.path.islink(filename) or not os.path.isfile(filename) or not is_bulky(filename) \
+                    or filename.endswith('.gz'):
+                continue
+            size = os.path.getsize(filename)
+            if size < self.min_size:
+                continue
+            (compressed, checksum) = compress_file(filename)
+            saved += size - os.path.getsize(compressed)
+            if self.dedup and compressed.endswith('.spg.gz'):
+                if self.deduplicate(compressed, checksum):
+                    saved += os.path.getsize(compressed)
+        return saved
+
+    def get_usage(self, evictable):
+        """
+        Returns the total size of the files in the runs directory, counting
+        hard linked files once, the bulky files in the evictable run
+        directories as a list of (last use, filename, size), and the files
+        in the pool by inode.
+        """
+        evictable = set(os.path.normpath(run_dir) for run_dir in evictable)
+        total = 0
+        inodes = set()
+        bulky = []
+        pooled = {}
+        for (directory, dirs, files) in os.walk(self.runs_dir):
+            in_pool = os.path.normpath(directory).startswith(os.path.normpath(self.pool_dir))
+            for name in files:
+                filename = os.path.join(directory, name)
+                stat = os.lstat(filename)
+                if not (stat.st_dev, stat.st_ino) in inodes:
+                    inodes.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+                if in_pool:
+                    pooled[(stat.st_dev, stat.st_ino)] = filename
+                elif os.path.normpath(directory) in evictable and is_bulky(filename) \
+                        and not os.path.islink(filename):
+                    bulky.append((get_last_use(stat), filename, stat.st_size))
+        return (total, bulky, pooled)
+
+    def enforce_quota(self, evictable):
+        """
+        Removes the least recently used bulky files of the evictable run
+        directories until the runs directory fits in the quota. Only
+        finished runs should be evictable: the files of active runs are
+        still being written. A file that is hard linked from several runs
+        only frees space when its last link is removed; the copy in the
+        pool is removed with the last run that links to it. Returns the
+        number of removed files.
+        """
+        if self.quota is None:
+            return 0
+        (total, bulky, pooled) = self.get_usage(evictable)
+        if total <= self.quota:
+            return 0
+        print >> sys.stderr, 'Runs use {:.1f} MB, quota is {:.1f} MB.'.format(
+            total / 1048576.0, self.quota / 1048576.0)
+        removed = 0
+        for (last_use, filename, size) in sorted(bulky):
+            if total <= self.quota:
+                break
+            stat = os.lstat(filename)
+            inode = (stat.st_dev, stat.st_ino)
+            os.remove(filename)
+            removed += 1
+            print >> sys.stderr, 'Evicted', filename
+            if stat.st_nlink == 1:
+                total -= size
+            elif stat.st_nlink == 2 and inode in pooled:
+                # no run links to the pooled copy anymore
+                os.remove(pooled.pop(inode))
+                total -= size
+        return removed
+
+    def process(self, run_dirs, evictable):
+        """
+        Compacts the run directories and enforces the quota, evicting
+        files from the evictable run directories only.
+        """
+        with self.locked():
+            saved = 0
+            for run_dir in run_dirs:
+                saved += self.compact(run_dir)
+            if saved > 0:
+                print >> sys.stderr, 'Compaction saved {:.1f} MB.'.format(saved / 1048576.0)
+            self.enforce_quota(evictable)
@@ -0,0 +1,167 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+journal.py
+
+Brief: Append-only journal of planned, started and completed runs, used
+to resume an interrupted campaign.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import errno
+import fcntl
+import json
+import socket
+import sys
+import tempfile
+import time
+
+
+def write_atomic(filename, content):
+    """
+    Writes the file such that it either has the new contents or does not
+    change, also if the machine crashes while writing.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    (fd, tmp) = tempfile.mkstemp(prefix='.' + os.path.basename(filename), dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp, filename)
+    except:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def get_boot_id():
+    """
+    Returns the id of the current boot of the machine, or None if it is
+    not available.
+    """
+    try:
+        with open('/proc/sys/kernel/random/boot_id', 'r') as f:
+            return f.read().strip()
+    except IOError:
+        return None
+
+
+def get_start_time(pid):
+    """
+    Returns the time at which a process started, in clock ticks since the
+    boot, or None if the process does not exist. Together with the pid and
+    the boot id, it identifies the process, also when the pid is reused.
+    """
+    try:
+        with open('/proc/{}/stat'.format(pid), 'r') as f:
+            stat = f.read()
+    except IOError:
+        return None
+    # the command name may contain spaces and parentheses
+    fields = stat[stat.rfind(')') + 2:].split()
+    return int(fields[19])
+
+
+class Journal:
+    """
+    Records for every run (experiment and number of cores) the target
+    number of repetitions, and the run directories that have been started
+    and completed. Every event is a line of JSON that is synced to disk
+    before the journal is used further; a torn last line is ignored.
+    """
+    def __init__(self, filename = 'runs/journal.jsonl'):
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.filename = filename
+
+    def append(self, event, **fields):
+        fields['event'] = event
+        fields['time'] = time.time()
+        line = json.dumps(fields, sort_keys=True) + '\n'
+        with open(self.filename, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # do not continue a line that was torn by a crash
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != '\n':
+                        line = '\n' + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def plan(self, name, cores, target):
+        self.append('planned', name=name, cores=cores, target=target)
+
+    def start(self, name, cores, run_dir):
+        self.append('started', name=name, cores=cores, run_dir=run_dir,
+                    host=socket.gethostname(), pid=os.getpid(),
+                    boot_id=get_boot_id(), start_time=get_start_time(os.getpid()))
+
+    def complete(self, name, cores, run_dir):
+        self.append('completed', name=name, cores=cores, run_dir=run_dir)
+
+    def quarantine(self, name, cores, run_dir, destination):
+        self.append('quarantined', name=name, cores=cores, run_dir=run_dir, destination=destination)
+
+    def read(self):
+        events = []
+        if not os.path.isfile(self.filename):
+            return events
+        with open(self.filename, 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    print >> sys.stderr, 'Ignoring incomplete journal entry.'
+        return events
+
+    def get_state(self):
+        """
+        Returns the target number of repetitions per (name, cores) of the
+        latest plan, and the 'started' events of run directories that have
+        not been completed.
+        """
+        targets = {}
+        started = {}
+        for event in self.read():
+            if event['event'] == 'planned':
+                targets[(event['name'], event['cores'])] = event['target']
+            elif event['event'] == 'started':
+                started[event['run_dir']] = event
+            elif event['event'] in ['completed', 'quarantined']:
+                started.pop(event['run_dir'], None)
+        return (targets, started.values())
+
+    def is_active(self, event):
+        """
+        Returns True if the process that started the run may still be
+        running it. Runs started on other machines are assumed to be active.
+        The process is identified by its start time and the boot id, such
+        that a later process with the same pid does not count; only the pid
+        is checked for events that were written without them.
+        """
+        if event['host'] != socket.gethostname():
+            return True
+        if event.get('boot_id') is None or event.get('start_time') is None:
+            return is_alive(event['pid'])
+        return event['boot_id'] == get_boot_id() and event['start_time'] == get_start_time(event['pid'])
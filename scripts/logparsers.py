@@ -0,0 +1,176 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+logparsers.py
+
+Brief: Extracts statistics from the logs of the LTSmin and mCRL2 tools.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import re
+
+number = '(\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)'
+
+
+def to_number(value):
+    f = float(value)
+    if f.is_integer() and abs(f) < 2**63:
+        return int(f)
+    return f
+
+
+class LogParser:
+    """
+    Extracts statistics from the output of a tool. Every pattern is
+    a pair of a list of metric names and a regular expression with a
+    group for each metric. If a pattern matches several lines,
+    the last match is kept. The metrics in progress describe how far
+    a running tool is.
+    """
+    patterns = []
+    progress = []
+
+    def __init__(self):
+        self.compiled = [(metrics, re.compile(pattern)) for (metrics, pattern) in self.patterns]
+
+    def parse_line(self, line, statistics):
+        for (metrics, pattern) in self.compiled:
+            m = pattern.search(line)
+            if not m is None:
+                for metric, value in zip(metrics, m.groups()):
+                    try:
+                        statistics[metric] = to_number(value)
+                    except ValueError:
+                        statistics[metric] = value
+
+
+class Lps2ltsSymParser(LogParser):
+    progress = ['levels', 'states']
+    patterns = [
+        (['levels'], 'level (\d+) is finished'),
+        (['states', 'nodes'], 'state space has ' + number + ' states, (\d+) nodes'),
+        (['group_checks', 'next_state_calls'], 'took (\d+) group checks and (\d+) next state calls'),
+        (['reachability_time'], 'reachability took ' + number + ' real'),
+        (['peak_nodes'], 'peak nodes:? (\d+)'),
+        (['vset_memory'], 'vset memory(?: usage)?:? ' + number)
+    ]
+
+
+class Pbes2ltsSymParser(Lps2ltsSymParser):
+    # the symbolic tools share the exploration output
+    patterns = Lps2ltsSymParser.patterns + [
+        (['vertices'], 'parity game has ' + number + ' vertices'),
+        (['priorities'], '(\d+) priorities')
+    ]
+
+
+class Lps2ltsMcParser(LogParser):
+    progress = ['levels', 'states']
+    patterns = [
+        (['levels', 'states', 'transitions'], '~(\d+) levels ~(\d+) states ~(\d+) transitions'),
+        (['states', 'transitions'], '[Ee]xplored ' + number + ' states,? ' + number + ' transitions'),
+        (['states'], '[Ss]tate space has ' + number + ' states'),
+        (['fanout'], 'fanout:? ' + number),
+        (['table_size'], '[Tt]able size:? ' + number),
+        (['exploration_time'], '[Ee]xploration time ' + number)
+    ]
+
+
+class SpgsolverParser(LogParser):
+    progress = ['iterations']
+    patterns = [
+        (['vertices'], '(?:game|graph) (?:has|with) ' + number + ' (?:vertices|nodes)'),
+        (['iterations'], '(\d+) iterations'),
+        (['attractor_calls'], '(\d+) attractor (?:calls|computations)'),
+        (['attractor_levels'], '(\d+) attractor levels'),
+        (['winner'], '[Pp]layer (\d) wins'),
+        (['result'], '[Rr]esult(?: is)?:? (true|false)')
+    ]
+
+
+class Mcrl2Parser(LogParser):
+    patterns = [
+        (['summands'], '(\d+) summands'),
+        # not the count of removed parameters that, e.g., lpsconstelm reports
+        (['parameters'], '(?<![Rr]emoved )\\b(\d+) (?:process )?parameters'),
+        (['parameters'], '[Nn]umber of (?:process )?parameters\s*:\s*(\d+)'),
+        (['removed_parameters'], '[Rr]emoved (\d+) (?:process )?parameters'),
+        (['equations'], '(\d+) equations')
+    ]
+
+
+# parsers for every tool, new tools can be added here
+parsers = {
+    'pbes2lts-sym': Pbes2ltsSymParser,
+    'spgsolver': SpgsolverParser,
+    'lps2lts-sym': Lps2ltsSymParser,
+    'lps2lts-mc': Lps2ltsMcParser,
+    'mcrl22lps': Mcrl2Parser,
+    'lpssuminst': Mcrl2Parser,
+    'lpsparunfold': Mcrl2Parser,
+    'lpsrewr': Mcrl2Parser,
+    'lpsconstelm': Mcrl2Parser,
+    'lps2pbes': Mcrl2Parser
+}
+
+# programs that run a tool on a placement (see placement.py)
+placement_programs = ['taskset', 'numactl']
+
+
+class ProgressMonitor:
+    """
+    Parses the output of a running tool line by line and describes
+    its progress, e.g., '12 levels, 150000 states'.
+    """
+    def __init__(self, tool):
+        self.parser = parsers[tool]()
+        self.statistics = {}
+
+    def __call__(self, line):
+        self.parser.parse_line(line, self.statistics)
+        return ', '.join('{} {}'.format(self.statistics[metric], metric)
+                         for metric in self.parser.progress if metric in self.statistics)
+
+
+def get_tool(line):
+    """
+    Returns the name of the tool if the line is a command that starts a
+    known tool, as written to the log by run_command, and None otherwise.
+    """
+    words = line.split()
+    if len(words) == 0:
+        return None
+    if os.path.basename(words[0]) in placement_programs:
+        # the command has a placement prefix, e.g., 'taskset -c 0-3 pbes2lts-sym ...'
+        tools = [os.path.basename(word) for word in words[1:] if os.path.basename(word) in parsers]
+        return tools[0] if len(tools) > 0 else None
+    tool = os.path.basename(words[0])
+    if tool in parsers:
+        return tool
+    return None
+
+
+def parse_log(filename):
+    """
+    Parses a log file that consists of sections, each starting with the
+    command that produced it. Returns the statistics per tool.
+    """
+    statistics = {}
+    if not os.path.isfile(filename):
+        return statistics
+    parser = None
+    with open(filename) as f:
+        for line in f:
+            tool = get_tool(line)
+            if not tool is None:
+                parser = parsers[tool]()
+                statistics.setdefault(tool, {})
+                current = statistics[tool]
+            elif not parser is None:
+                parser.parse_line(line, current)
+    return statistics
@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+memory.py
+
+Brief: Measures the resident memory of a process and its descendants and
+kills them when they exceed a limit.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import errno
+import signal
+import time
+from processes import read_stats
+
+page_size = os.sysconf('SC_PAGE_SIZE')
+
+
+def get_process_tree(pid, stats = None):
+    """
+    Returns the pid and the pids of all descendants of the process,
+    using the process information from read_stats if given.
+    """
+    if stats is None:
+        stats = read_stats()
+    children = {}
+    for (child, (state, parent, group)) in stats.items():
+        children.setdefault(parent, []).append(child)
+    tree = []
+    pending = [pid]
+    while len(pending) > 0:
+        p = pending.pop()
+        tree.append(p)
+        pending += children.get(p, [])
+    return tree
+
+
+def get_rss(pid):
+    """
+    Returns the resident set size of a process in bytes, or 0 if the
+    process no longer exists.
+    """
+    try:
+        with open('/proc/{}/statm'.format(pid), 'r') as f:
+            return int(f.read().split()[1]) * page_size
+    except IOError:
+        return 0
+
+
+class MemoryMonitor:
+    """
+    Samples the total resident memory of a process tree at most once per
+    interval. The resident memory is limited rather than the address
+    space (as with ulimit -v), because tools that use lddmc reserve much
+    more virtual memory than they use.
+    """
+    def __init__(self, pid, limit, interval = 0.5):
+        self.pid = pid
+        self.limit = limit
+        self.interval = interval
+        self.last_check = 0
+        self.peak = 0
+        self.exceeded = False
+
+    def check(self):
+        """
+        Samples the memory use if the interval has passed, and kills the
+        process tree if it exceeds the limit. Returns True if the limit
+        has been exceeded.
+        """
+        now = time.time()
+        if self.exceeded or now - self.last_check < self.interval:
+            return self.exceeded
+        self.last_check = now
+        tree = get_process_tree(self.pid)
+        rss = sum(get_rss(p) for p in tree)
+        self.peak = max(self.peak, rss)
+        if not self.limit is None and rss > self.limit:
+            self.exceeded = True
+            for p in tree:
+                try:
+                    os.kill(p, signal.SIGKILL)
+                except OSError as e:
+                    if e.errno != errno.ESRCH:
+                        raise
+        return self.exceeded
@@ -0,0 +1,158 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+placement.py
+
+Brief: Assigns the CPUs and memory nodes on which runs are executed.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import glob
+import os
+import re
+import subprocess
+
+
+def parse_cpu_list(text):
+    """
+    Parses a CPU list as used by Linux and taskset, e.g., '0-3,8-11'.
+    """
+    cpus = []
+    for part in text.strip().split(','):
+        if part == '':
+            continue
+        if '-' in part:
+            (first, last) = part.split('-')
+            cpus += range(int(first), int(last) + 1)
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def format_cpu_list(cpus):
+    return ','.join(str(cpu) for cpu in sorted(cpus))
+
+
+def read_file(filename):
+    with open(filename, 'r') as f:
+        return f.read()
+
+
+def get_topology():
+    """
+    Returns a dictionary from the online CPUs to their NUMA node, read
+    from sysfs. Without NUMA information, all CPUs are on node 0.
+    """
+    online = '/sys/devices/system/cpu/online'
+    if os.path.isfile(online):
+        cpus = parse_cpu_list(read_file(online))
+    else:
+        import multiprocessing
+        cpus = range(multiprocessing.cpu_count())
+    topology = dict((cpu, 0) for cpu in cpus)
+    for node_dir in glob.glob('/sys/devices/system/node/node[0-9]*'):
+        node = int(re.search('(\d+)$', node_dir).group(1))
+        for cpu in parse_cpu_list(read_file(os.path.join(node_dir, 'cpulist'))):
+            if cpu in topology:
+                topology[cpu] = node
+    return topology
+
+
+def find_program(program):
+    return subprocess.call(['which', program], stdout=open(os.devnull, 'w')) == 0
+
+
+class Placement:
+    """
+    Allocates CPUs to concurrent runs, such that runs do not share CPUs.
+    The mode determines which CPUs a run gets:
+     - 'compact': the lowest free CPUs, filling one node before the next;
+     - 'scatter': the CPUs are spread evenly over the nodes;
+     - 'socket': all CPUs on a single node; a run waits until a node
+       has enough free CPUs.
+    With membind, runs only allocate memory on the nodes of their CPUs.
+    """
+    modes = ['compact', 'scatter', 'socket']
+
+    def __init__(self, mode = 'compact', membind = False, topology = None):
+        if not mode in self.modes:
+            raise Exception('Unknown placement mode: {}'.format(mode))
+        if topology is None:
+            topology = get_topology()
+        self.mode = mode
+        self.membind = membind
+        self.topology = topology
+        self.free = set(topology.keys())
+        program = 'numactl' if membind else 'taskset'
+        if not find_program(program):
+            raise Exception('{} not found, required for placement.'.format(program))
+
+    def get_nodes(self, cpus):
+        return sorted(set(self.topology[cpu] for cpu in cpus))
+
+    def get_node_cpus(self, node, cpus):
+        return sorted(cpu for cpu in cpus if self.topology[cpu] == node)
+
+    def can_place(self, n):
+        if self.mode == 'socket':
+            nodes = self.get_nodes(self.topology.keys())
+            return any(len(self.get_node_cpus(node, self.topology.keys())) >= n for node in nodes)
+        return n <= len(self.topology)
+
+    def select(self, n):
+        free = self.free
+        if len(free) < n:
+            return None
+        if self.mode == 'compact':
+            return sorted(free, key = lambda cpu: (self.topology[cpu], cpu))[:n]
+        nodes = self.get_nodes(free)
+        if self.mode == 'socket':
+            # best fit: the node with the fewest free CPUs that suffice
+            candidates = [self.get_node_cpus(node, free) for node in nodes]
+            candidates = [cpus for cpus in candidates if len(cpus) >= n]
+            if len(candidates) == 0:
+                return None
+            return min(candidates, key = len)[:n]
+        # scatter: take CPUs from the nodes in turn
+        queues = [self.get_node_cpus(node, free) for node in nodes]
+        cpus = []
+        while len(cpus) < n:
+            for queue in queues:
+                if len(queue) > 0 and len(cpus) < n:
+                    cpus.append(queue.pop(0))
+        return cpus
+
+    def allocate(self, n):
+        """
+        Returns a list of n free CPUs and marks them as used, or None
+        if the CPUs cannot be allocated now.
+        """
+        cpus = self.select(n)
+        if not cpus is None:
+            self.free -= set(cpus)
+        return cpus
+
+    def release(self, cpus):
+        self.free |= set(cpus)
+
+    def get_prefix(self, cpus):
+        """
+        Returns the command prefix that runs a tool on the CPUs.
+        """
+        if self.membind:
+            return 'numactl --physcpubind={} --membind={} '.format(
+                format_cpu_list(cpus), ','.join(str(node) for node in self.get_nodes(cpus)))
+        return 'taskset -c {} '.format(format_cpu_list(cpus))
+
+    def describe(self, cpus):
+        return {
+            'mode': self.mode,
+            'membind': self.membind,
+            'cpus': sorted(cpus),
+            'nodes': self.get_nodes(cpus),
+            'prefix': self.get_prefix(cpus).strip()
+        }
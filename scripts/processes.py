@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+processes.py
+
+Brief: Finds and terminates the processes of a process group.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import errno
+import signal
+import threading
+import time
+
+
+def read_stats():
+    """
+    Returns a dictionary from the pid of every process to a tuple
+    (state, parent, process group), read from /proc.
+    """
+    stats = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(entry), 'r') as f:
+                stat = f.read()
+        except IOError:
+            # the process has exited
+            continue
+        # the command name may contain spaces and parentheses
+        fields = stat[stat.rfind(')') + 2:].split()
+        stats[int(entry)] = (fields[0], int(fields[1]), int(fields[2]))
+    return stats
+
+
+def get_group(pgid):
+    """
+    Returns the pids of the processes in the process group that have not
+    exited. Zombies are left out: they no longer run and only wait to be
+    reaped by their parent.
+    """
+    return [pid for (pid, (state, parent, group)) in read_stats().items() if group == pgid and state != 'Z']
+
+
+def signal_group(pgid, sig):
+    """
+    Sends a signal to all processes in the group. Returns False if the
+    group no longer exists.
+    """
+    try:
+        os.killpg(pgid, sig)
+    except OSError as e:
+        if e.errno != errno.ESRCH:
+            raise
+        return False
+    return True
+
+
+class Waiter(threading.Thread):
+    """
+    Waits for a child process in the background, such that the time at
+    which it exits is recorded precisely, with its exit status and the
+    resource usage reported by wait4.
+    """
+    def __init__(self, pid):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.pid = pid
+        self.end = None
+        self.status = None
+        self.rusage = None
+
+    def run(self):
+        (pid, status, rusage) = os.wait4(self.pid, 0)
+        end = time.time()
+        self.status = status
+        self.rusage = rusage
+        # set last: the other fields are valid once end is set
+        self.end = end
+
+
+class GroupTerminator:
+    """
+    Terminates a process group: the processes get SIGTERM first and, if
+    some of them are still running 'grace' seconds later, SIGKILL.
+    """
+    def __init__(self, pgid, grace):
+        self.pgid = pgid
+        self.grace = grace
+        self.terminated = None
+        self.killed = False
+
+    def terminate(self):
+        if self.terminated is None:
+            self.terminated = time.time()
+            signal_group(self.pgid, signal.SIGTERM)
+
+    def escalate(self):
+        if not self.terminated is None and not self.killed and time.time() - self.terminated >= self.grace:
+            self.killed = True
+            signal_group(self.pgid, signal.SIGKILL)
+
+    def kill(self):
+        self.killed = True
+        signal_group(self.pgid, signal.SIGKILL)
+
+    def is_gone(self):
+        return len(get_group(self.pgid)) == 0
@@ -0,0 +1,220 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+results.py
+
+Brief: Index of the results of finished runs.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import re
+import json
+import sqlite3
+import sys
+from collections import OrderedDict
+from datetime import datetime
+
+result_pattern = re.compile('^(Timeout after|Out of memory after|\w+ took) (\d+\.\d*) seconds.')
+
+# actions that are not executed after the given action timed out or ran out of memory
+action_dependencies = {
+    'spgsolver': 'pbes2spg'
+}
+
+
+def read_result(output_dir, action):
+    """
+    Reads the result file of an action in a single pass.
+    Returns a pair (status, time), where status is 'done', 'timeout' or
+    'memory', or None if there is no result file.
+    """
+    result_file = '{}/{}.result'.format(output_dir, action)
+    if not os.path.isfile(result_file):
+        return None
+    with open(result_file) as f:
+        for l in f:
+            m = result_pattern.match(l)
+            if not m is None:
+                if m.group(1) == 'Timeout after':
+                    status = 'timeout'
+                elif m.group(1) == 'Out of memory after':
+                    status = 'memory'
+                else:
+                    status = 'done'
+                return (status, float(m.group(2)))
+    raise Exception('No time found in ' + result_file)
+
+
+def read_metrics(output_dir, action):
+    """
+    Reads the metrics file of an action. Returns a dictionary, which is
+    empty if there is no metrics file.
+    """
+    metrics_file = '{}/{}.metrics.json'.format(output_dir, action)
+    if not os.path.isfile(metrics_file):
+        return {}
+    with open(metrics_file) as f:
+        return json.load(f)
+
+
+def read_options(output_dir):
+    """
+    Reads the tool options of a run. Returns a dictionary, which is
+    empty if there is no options file.
+    """
+    options_file = '{}/options.json'.format(output_dir)
+    if not os.path.isfile(options_file):
+        return {}
+    with open(options_file) as f:
+        return json.load(f)
+
+
+class ResultsIndex:
+    """
+    SQLite database with the results of the runs in the runs directory.
+    A run is complete when every action has a result, or was not executed
+    because an action it depends on timed out or ran out of memory;
+    directories of complete runs are never read again.
+    An action of which the output was taken from the artifact store has
+    a '.cached' file instead of a result and is not counted.
+    """
+    def __init__(self, filename = 'runs/index.sqlite'):
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        # several runs may finish at the same time
+        self.connection = sqlite3.connect(filename, timeout=600)
+        self.create_tables()
+
+    def create_tables(self):
+        with self.connection:
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS runs (
+                run_dir TEXT PRIMARY KEY,
+                name TEXT,
+                cores INTEGER,
+                complete INTEGER,
+                registered TEXT
+            )''')
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS results (
+                run_dir TEXT,
+                action TEXT,
+                status TEXT,
+                time REAL,
+                PRIMARY KEY (run_dir, action)
+            )''')
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS metrics (
+                run_dir TEXT,
+                action TEXT,
+                metric TEXT,
+                value REAL,
+                PRIMARY KEY (run_dir, action, metric)
+            )''')
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS options (
+                run_dir TEXT,
+                option TEXT,
+                value TEXT,
+                PRIMARY KEY (run_dir, option)
+            )''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS runs_name_cores ON runs (name, cores)')
+
+    def is_complete(self, run_dir):
+        row = self.connection.execute('SELECT complete FROM runs WHERE run_dir = ?', (run_dir,)).fetchone()
+        return not row is None and row[0] == 1
+
+    def register(self, run_dir, name, cores, actions):
+        """
+        Reads the results of a run directory and stores them in the index.
+        """
+        results = {}
+        metrics = {}
+        complete = True
+        for action in actions:
+            result = read_result(run_dir, action)
+            if not result is None:
+                results[action] = result
+                metrics[action] = read_metrics(run_dir, action)
+            elif not os.path.isfile('{}/{}.cached'.format(run_dir, action)):
+                dependency = results.get(action_dependencies.get(action))
+                if dependency is None or not dependency[0] in ['timeout', 'memory']:
+                    complete = False
+        options = read_options(run_dir)
+        registered = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)',
+                                    (run_dir, name, cores, int(complete), registered))
+            self.connection.execute('DELETE FROM results WHERE run_dir = ?', (run_dir,))
+            self.connection.execute('DELETE FROM metrics WHERE run_dir = ?', (run_dir,))
+            self.connection.execute('DELETE FROM options WHERE run_dir = ?', (run_dir,))
+            for option, value in options.items():
+                self.connection.execute('INSERT INTO options VALUES (?, ?, ?)', (run_dir, option, value))
+            for action, (status, time) in results.items():
+                self.connection.execute('INSERT INTO results VALUES (?, ?, ?, ?)',
+                                        (run_dir, action, status, time))
+                for metric, value in metrics[action].items():
+                    self.connection.execute('INSERT INTO metrics VALUES (?, ?, ?, ?)',
+                                            (run_dir, action, metric, value))
+
+    def update(self, run_dirs, name, cores, actions):
+        """
+        Registers the run directories that are not complete in the index
+        and removes runs of which the directory no longer exists.
+        Returns the number of directories that have been read.
+        """
+        existing = set(run_dirs)
+        indexed = self.connection.execute('SELECT run_dir FROM runs WHERE name = ? AND cores = ?',
+                                          (name, cores)).fetchall()
+        removed = [(run_dir,) for (run_dir,) in indexed if not run_dir in existing]
+        if len(removed) > 0:
+            with self.connection:
+                self.connection.executemany('DELETE FROM runs WHERE run_dir = ?', removed)
+                self.connection.executemany('DELETE FROM results WHERE run_dir = ?', removed)
+                self.connection.executemany('DELETE FROM metrics WHERE run_dir = ?', removed)
+                self.connection.executemany('DELETE FROM options WHERE run_dir = ?', removed)
+        n = 0
+        for run_dir in run_dirs:
+            if not self.is_complete(run_dir):
+                try:
+                    self.register(run_dir, name, cores, actions)
+                except Exception as e:
+                    print >> sys.stderr, 'Skipping run directory {}: {}'.format(run_dir, e)
+                    continue
+                n += 1
+        return n
+
+    def get_complete_run_dirs(self):
+        return [run_dir for (run_dir,) in self.connection.execute('SELECT run_dir FROM runs WHERE complete = 1')]
+
+    def count_complete(self, name, cores):
+        row = self.connection.execute('SELECT COUNT(*) FROM runs WHERE name = ? AND cores = ? AND complete = 1',
+                                      (name, cores)).fetchone()
+        return row[0]
+
+    def get_results(self, name, cores, action):
+        """
+        Returns the list of (status, time) pairs of an action for all runs
+        of an experiment with a number of cores.
+        """
+        return self.connection.execute('''SELECT status, time
+            FROM runs JOIN results USING (run_dir)
+            WHERE name = ? AND cores = ? AND action = ?
+            ORDER BY run_dir''', (name, cores, action)).fetchall()
+
+    def get_metrics(self, name, cores, action):
+        """
+        Returns for every run of an experiment with a number of cores
+        in which the action finished, a dictionary with the metrics of
+        the action.
+        """
+        rows = self.connection.execute('''SELECT run_dir, metric, value
+            FROM runs JOIN results USING (run_dir) JOIN metrics USING (run_dir, action)
+            WHERE name = ? AND cores = ? AND action = ? AND status = 'done'
+            ORDER BY run_dir''', (name, cores, action)).fetchall()
+        metrics = OrderedDict()
+        for (run_dir, metric, value) in rows:
+            metrics.setdefault(run_dir, {})[metric] = value
+        return metrics.values()
@@ -0,0 +1,179 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+scaling.py
+
+Brief: Generates a family of models of increasing size with an experiments
+file, and fits the growth of run time and memory to the model size.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import re
+import sys
+import json
+import math
+import numpy
+
+
+class Family:
+    """
+    A parametric model family: instantiates a template model for a set of
+    parameters and computes the size of an instance.
+    """
+    def size(self, parameters):
+        pass
+
+    def instantiate(self, template, parameters):
+        pass
+
+
+class ConnectFour(Family):
+    """
+    The Connect Four model in data/connectfour, with N columns, M rows
+    and R pieces in a row needed to win. The size is the number of cells.
+    """
+    def size(self, parameters):
+        return parameters['N'] * parameters['M']
+
+    def instantiate(self, template, parameters):
+        N = parameters['N']
+        M = parameters['M']
+        R = parameters.get('R', 4)
+        model = template
+        for name, value in [('N', N), ('M', M), ('R', R)]:
+            model = re.sub('(\\b{}\\s*=\\s*)\\d+'.format(name),
+                           lambda m: m.group(1) + str(value), model, count=1)
+        row = '[' + ','.join(['None'] * N) + ']'
+        board = 'eqn initial_board= [' + ',\n                    '.join([row] * M) + '];'
+        model = re.sub('^eqn initial_board=.*?;', board, model, count=1, flags=re.M | re.S)
+        return model
+
+
+families = {
+    'connectfour': ConnectFour
+}
+
+
+def format_options(options, parameters):
+    """
+    Substitutes the parameters in all strings of the (nested) options.
+    """
+    if isinstance(options, basestring):
+        return options.format(**parameters)
+    if isinstance(options, list):
+        return [format_options(o, parameters) for o in options]
+    if isinstance(options, dict):
+        return dict((k, format_options(v, parameters)) for k, v in options.items())
+    return options
+
+
+def get_model_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def generate_suite(spec):
+    """
+    Writes a model for every set of parameters in the specification
+    and returns the experiments for all models and properties.
+    """
+    family = families[spec['family']]()
+    with open(spec['template'], 'r') as f:
+        template = f.read()
+    model_dir = spec.get('model_dir', 'mcrl2')
+    if not os.path.isdir(model_dir):
+        os.makedirs(model_dir)
+    properties = spec['properties']
+    experiments = []
+    for parameters in spec['parameters']:
+        model_name = spec['name'].format(**parameters)
+        input_mcrl2 = os.path.join(model_dir, model_name + '.mcrl2')
+        print >> sys.stderr, 'Writing', input_mcrl2
+        with open(input_mcrl2, 'w') as f:
+            f.write(family.instantiate(template, parameters))
+        for input_mcf in properties:
+            property_name = get_model_name(input_mcf)
+            name = model_name
+            if len(properties) > 1:
+                name += '-' + property_name
+            experiments.append({
+                'name': name,
+                'type': 'pbes',
+                'input_mcrl2': input_mcrl2,
+                'lps_filename': 'output/{}.lps'.format(model_name),
+                'input_mcf': input_mcf,
+                'pbes_filename': 'output/{}.{}.pbes'.format(model_name, property_name),
+                'preparation_options': format_options(spec['preparation_options'], parameters),
+                'run_options': spec['run_options'],
+                'scaling': {
+                    'family': spec['family'],
+                    'property': property_name,
+                    'parameters': parameters,
+                    'size': family.size(parameters)
+                }
+            })
+    return experiments
+
+
+def fit_growth(sizes, values):
+    """
+    Fits an exponential model (value = a * exp(b * size)) and a power law
+    (value = a * size ^ b) by least squares on the logarithm of the values.
+    Returns the model with the best fit as a tuple (kind, a, b, r2).
+    """
+    y = numpy.log(values)
+    best = None
+    for kind, x in [('exp', numpy.array(sizes, dtype=float)),
+                    ('power', numpy.log(sizes))]:
+        (b, log_a) = numpy.polyfit(x, y, 1)
+        residual = numpy.sum((y - (log_a + b * x)) ** 2)
+        total = numpy.sum((y - numpy.mean(y)) ** 2)
+        r2 = 1.0 if total == 0 else 1.0 - residual / total
+        if best is None or r2 > best[3]:
+            best = (kind, math.exp(log_a), b, r2)
+    return best
+
+
+def predict_size(model, budget):
+    """
+    Returns the size at which the fitted model reaches the budget,
+    or None if the model does not grow.
+    """
+    (kind, a, b, r2) = model
+    if b <= 0:
+        return None
+    if kind == 'exp':
+        return (math.log(budget) - math.log(a)) / b
+    return math.exp((math.log(budget) - math.log(a)) / b)
+
+
+def usage():
+    command = os.path.basename(sys.argv[0])
+    return """Usage: {0} <family.json>
+Generates the models and the experiments file described in the family file.
+Paths in the family file are relative to the directory of the family file.""".format(command)
+
+
+def main():
+    if len(sys.argv) <= 1:
+        print >> sys.stderr, usage()
+        sys.exit(1)
+    spec_filename = sys.argv[1]
+    with open(spec_filename, 'r') as f:
+        spec = json.load(f)
+    spec_dir = os.path.dirname(os.path.abspath(spec_filename))
+    os.chdir(spec_dir)
+    experiments = generate_suite(spec)
+    experiments_filename = spec.get('experiments', 'experiments-scaling.json')
+    with open(experiments_filename, 'w') as f:
+        json.dump({'data': experiments}, f, indent=4, sort_keys=True, separators=(',', ': '))
+        f.write('\n')
+    print >> sys.stderr, 'Experiments:', len(experiments), 'written to', experiments_filename
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+scheduler.py
+
+Brief: Runs jobs in parallel processes without exceeding a core budget.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import multiprocessing
+import sys
+import time
+
+
+class Job:
+    """
+    A function call that is executed in a separate process and
+    occupies a number of cores while running. A job is only started
+    after all jobs it depends on have finished successfully.
+    """
+    def __init__(self, label, function, args = (), cores = 1, dependencies = None):
+        self.label = label
+        self.function = function
+        self.args = args
+        self.cores = cores
+        if dependencies is None:
+            dependencies = []
+        self.dependencies = dependencies
+        self.process = None
+        self.cpus = None
+        self.exitcode = None
+        self.skipped = False
+        self.waiting = 0
+
+    def is_ready(self):
+        return all(job.exitcode == 0 for job in self.dependencies)
+
+    def is_blocked(self):
+        return any(job.skipped or not job.exitcode in [None, 0] for job in self.dependencies)
+
+
+class Scheduler:
+    """
+    Packs jobs onto the available cores: a job is started as soon as
+    the sum of the core demands of the active jobs plus its own demand
+    fits in the budget. Larger jobs are tried first (first fit decreasing).
+    Smaller jobs may start before a larger job that does not fit yet, but
+    once a job has waited max_wait_rounds rounds, no job after it is
+    started until it runs, such that large jobs do not starve.
+    With a placement, every job is also assigned a set of CPUs, which is
+    passed to the function of the job as an extra argument.
+    """
+    def __init__(self, max_cores = None, poll_interval = 0.5, placement = None, max_wait_rounds = 20):
+        if max_cores is None:
+            max_cores = multiprocessing.cpu_count()
+        self.max_cores = max_cores
+        self.placement = placement
+        self.poll_interval = poll_interval
+        self.max_wait_rounds = max_wait_rounds
+        self.pending = []
+        self.active = []
+        self.finished = []
+
+    def add(self, job):
+        if job.cores > self.max_cores:
+            raise Exception('Job {} requires {} cores, but the budget is {}.'.format(
+                job.label, job.cores, self.max_cores))
+        if not self.placement is None and not self.placement.can_place(job.cores):
+            raise Exception('Job {} requires {} cores, which cannot be placed.'.format(job.label, job.cores))
+        self.pending.append(job)
+
+    def used_cores(self):
+        return sum(job.cores for job in self.active)
+
+    def start(self, job):
+        print >> sys.stderr, 'Starting {} ({} cores, {} of {} in use)'.format(
+            job.label, job.cores, self.used_cores() + job.cores, self.max_cores)
+        args = job.args
+        if not job.cpus is None:
+            args = args + (job.cpus,)
+        job.process = multiprocessing.Process(target=job.function, args=args)
+        job.process.start()
+        self.active.append(job)
+
+    def start_pending(self):
+        # sort is stable, so jobs with equal demand keep their order
+        self.pending.sort(key=lambda job: job.cores, reverse=True)
+        # the cores are reserved for a job that has waited too long
+        reserved = False
+        for job in list(self.pending):
+            if job.is_blocked():
+                print >> sys.stderr, 'Skipping {}: a job it depends on failed.'.format(job.label)
+                job.skipped = True
+                self.pending.remove(job)
+                self.finished.append(job)
+            elif job.is_ready() and not reserved:
+                if self.used_cores() + job.cores <= self.max_cores:
+                    if not self.placement is None:
+                        job.cpus = self.placement.allocate(job.cores)
+                    if self.placement is None or not job.cpus is None:
+                        self.pending.remove(job)
+                        self.start(job)
+                        continue
+                job.waiting += 1
+                if job.waiting >= self.max_wait_rounds:
+                    reserved = True
+        if len(self.active) == 0 and not any(job.is_ready() or job.is_blocked() for job in self.pending) \
+                and len(self.pending) > 0:
+            raise Exception('Jobs depend on jobs that are not scheduled.')
+
+    def reap(self):
+        for job in list(self.active):
+            if not job.process.is_alive():
+                job.process.join()
+                job.exitcode = job.process.exitcode
+                self.active.remove(job)
+                self.finished.append(job)
+                if not job.cpus is None:
+                    self.placement.release(job.cpus)
+                if not job.exitcode == 0:
+                    print >> sys.stderr, 'Job failed:', job.label, '(exit code {})'.format(job.exitcode)
+
+    def run(self):
+        """
+        Runs all jobs and returns the list of failed jobs.
+        """
+        total = len(self.pending)
+        print >> sys.stderr, 'Scheduling {} jobs on {} cores.'.format(total, self.max_cores)
+        try:
+            while len(self.pending) > 0 or len(self.active) > 0:
+                self.start_pending()
+                time.sleep(self.poll_interval)
+                self.reap()
+        except KeyboardInterrupt:
+            for job in self.active:
+                job.process.terminate()
+            raise
+        failed = [job for job in self.finished if job.skipped or not job.exitcode == 0]
+        print >> sys.stderr, 'Finished {} jobs ({} failed).'.format(total, len(failed))
+        return failed
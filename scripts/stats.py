@@ -0,0 +1,242 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+stats.py
+
+Brief: Statistics on run times with timeouts, where a timeout is a
+censored observation: the time limit is a lower bound of the run time.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import math
+import numpy
+
+bootstrap_samples = 1000
+confidence = 0.95
+
+
+def get_observations(results):
+    """
+    Converts (status, time) results from the index to a list of
+    (time, censored) observations. Runs that ran out of memory say
+    nothing about the time and are left out.
+    """
+    return [(t, status == 'timeout') for (status, t) in results if status != 'memory']
+
+
+def censored_median(observations):
+    """
+    Returns the median of the observations as a tuple (value, censored).
+    Censored observations are larger than all uncensored ones. If the
+    median falls on a censored observation, the value is the smallest
+    time limit involved and only a lower bound of the median.
+    """
+    n = len(observations)
+    if n == 0:
+        return (None, False)
+    ordered = sorted(observations, key = lambda o: (o[1], o[0]))
+    middle = ordered[(n - 1) // 2 : n // 2 + 1]
+    if any(censored for (t, censored) in middle):
+        return (min(t for (t, censored) in middle if censored), True)
+    return (numpy.mean([t for (t, censored) in middle]), False)
+
+
+def get_ratio(numerator, denominator):
+    """
+    Returns the ratio of two censored medians as a tuple (value, bound),
+    where bound is '=' for an exact value, '>=' for a lower bound,
+    '<=' for an upper bound and None if the ratio is unknown.
+    """
+    (a, a_censored) = numerator
+    (b, b_censored) = denominator
+    if a is None or b is None or (a_censored and b_censored) or b == 0:
+        return (None, None)
+    if a_censored:
+        return (a / b, '>=')
+    if b_censored:
+        return (a / b, '<=')
+    return (a / b, '=')
+
+
+def bootstrap_ratio(numerator, denominator, samples = bootstrap_samples, seed = 0):
+    """
+    Computes a percentile bootstrap confidence interval for the ratio of
+    the medians of two sets of observations, e.g., the speedup. Resamples
+    for which the ratio is unknown are counted as missing; the interval
+    is None if more than half of the resamples are missing.
+    """
+    if len(numerator) == 0 or len(denominator) == 0:
+        return None
+    random = numpy.random.RandomState(seed)
+    ratios = []
+    for i in range(samples):
+        a = [numerator[j] for j in random.randint(0, len(numerator), len(numerator))]
+        b = [denominator[j] for j in random.randint(0, len(denominator), len(denominator))]
+        (value, bound) = get_ratio(censored_median(a), censored_median(b))
+        if not value is None:
+            ratios.append(value)
+    if len(ratios) < samples / 2:
+        return None
+    alpha = (1 - confidence) / 2
+    return (numpy.percentile(ratios, 100 * alpha), numpy.percentile(ratios, 100 * (1 - alpha)))
+
+
+def bootstrap_mean(values, samples = bootstrap_samples, seed = 0):
+    """
+    Computes a percentile bootstrap confidence interval for the mean
+    of the values. Returns None for fewer than two values.
+    """
+    if len(values) < 2:
+        return None
+    random = numpy.random.RandomState(seed)
+    values = numpy.array(values, dtype=float)
+    means = [numpy.mean(values[random.randint(0, len(values), len(values))]) for i in range(samples)]
+    alpha = (1 - confidence) / 2
+    return (numpy.percentile(means, 100 * alpha), numpy.percentile(means, 100 * (1 - alpha)))
+
+
+def relative_width(values):
+    """
+    Returns the width of the confidence interval of the mean relative
+    to the mean, or None if it cannot be computed.
+    """
+    interval = bootstrap_mean(values)
+    mean = numpy.mean(values) if len(values) > 0 else 0
+    if interval is None or mean == 0:
+        return None
+    return (interval[1] - interval[0]) / mean
+
+
+def get_comparable(observations):
+    """
+    Converts (time, censored) observations to values that can be compared:
+    a censored observation is larger than every uncensored one, and equal
+    to the other censored ones.
+    """
+    return [float('inf') if censored else t for (t, censored) in observations]
+
+
+def get_ranks(values):
+    """
+    Returns the ranks (starting at 1) of the values, where tied values get
+    the average of their ranks.
+    """
+    order = sorted(range(len(values)), key = lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return ranks
+
+
+def count_u_distribution(m, n):
+    """
+    Returns the number of orderings of m and n values without ties for each
+    value of the Mann-Whitney statistic U, as a list indexed by U.
+    """
+    # counts[i][j][u]: for i values of the first and j of the second sample
+    counts = [[None] * (n + 1) for i in range(m + 1)]
+    for i in range(m + 1):
+        for j in range(n + 1):
+            if i == 0 or j == 0:
+                counts[i][j] = [1]
+                continue
+            # the largest value is from the first sample (exceeding all j
+            # values of the second sample) or from the second sample
+            first = [0] * j + counts[i - 1][j]
+            second = counts[i][j - 1]
+            size = max(len(first), len(second))
+            counts[i][j] = [(first[u] if u < len(first) else 0) + (second[u] if u < len(second) else 0)
+                            for u in range(size)]
+    return counts[m][n]
+
+
+def mann_whitney_u(x, y):
+    """
+    Tests whether the values of x tend to be larger or smaller than those
+    of y with the two-sided Mann-Whitney U test. Returns a tuple (U, p),
+    where U counts the pairs in which the value of x is larger (ties count
+    half). The p-value is exact for small samples without ties, and
+    otherwise uses the normal approximation with a correction for ties.
+    Returns (None, None) if a sample is empty.
+    """
+    m = len(x)
+    n = len(y)
+    if m == 0 or n == 0:
+        return (None, None)
+    values = list(x) + list(y)
+    ranks = get_ranks(values)
+    u = sum(ranks[:m]) - m * (m + 1) / 2.0
+    mean = m * n / 2.0
+    tied = len(set(values)) < len(values)
+    if not tied and m * n <= 400:
+        counts = count_u_distribution(m, n)
+        total = float(sum(counts))
+        # the distribution is symmetric around the mean
+        extreme = min(u, m * n - u)
+        p = 2 * sum(counts[:int(round(extreme)) + 1]) / total
+        return (u, min(1.0, p))
+    groups = {}
+    for v in values:
+        groups[v] = groups.get(v, 0) + 1
+    ties = sum(t ** 3 - t for t in groups.values())
+    N = m + n
+    variance = m * n / 12.0 * ((N + 1) - ties / float(N * (N - 1)))
+    if variance == 0:
+        return (u, 1.0)
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    p = math.erfc(max(z, 0) / math.sqrt(2))
+    return (u, min(1.0, p))
+
+
+def cliffs_delta(x, y):
+    """
+    Returns Cliff's delta, the probability that a value of x is larger than
+    a value of y minus the probability that it is smaller, between -1 and 1.
+    Returns None if a sample is empty.
+    """
+    if len(x) == 0 or len(y) == 0:
+        return None
+    larger = sum(1 for a in x for b in y if a > b)
+    smaller = sum(1 for a in x for b in y if a < b)
+    return (larger - smaller) / float(len(x) * len(y))
+
+
+def get_effect_size(delta):
+    """
+    Describes the magnitude of Cliff's delta with the thresholds of
+    Romano et al.
+    """
+    if delta is None:
+        return None
+    d = abs(delta)
+    if d < 0.147:
+        return 'negligible'
+    if d < 0.33:
+        return 'small'
+    if d < 0.474:
+        return 'medium'
+    return 'large'
+
+
+def holm(pvalues):
+    """
+    Adjusts p-values for multiple comparisons with the Holm-Bonferroni
+    method. Missing p-values (None) are ignored.
+    """
+    indices = sorted((i for (i, p) in enumerate(pvalues) if not p is None), key = lambda i: pvalues[i])
+    adjusted = [None] * len(pvalues)
+    previous = 0.0
+    for (k, i) in enumerate(indices):
+        previous = max(previous, min(1.0, (len(indices) - k) * pvalues[i]))
+        adjusted[i] = previous
+    return adjusted
@@ -0,0 +1,265 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+status.py
+
+Brief: Monitors the active runs of a campaign and publishes their status
+as a JSON file and, optionally, over HTTP.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import json
+import socket
+import sys
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import numpy
+from journal import Journal, write_atomic
+from logparsers import ProgressMonitor
+from memory import get_process_tree, get_rss
+from processes import read_stats
+from results import ResultsIndex
+
+# the tool that writes the log of each action
+action_tools = {
+    'pbes2spg': 'pbes2lts-sym',
+    'spgsolver': 'spgsolver',
+    'lps2lts-sym': 'lps2lts-sym',
+    'lps2lts-mc': 'lps2lts-mc'
+}
+
+max_read = 1024 * 1024 # bytes of a log read per update
+clock_ticks = os.sysconf('SC_CLK_TCK')
+
+
+def get_cpu_time(pid):
+    """
+    Returns the user and system time of a process in seconds, or 0 if the
+    process no longer exists.
+    """
+    try:
+        with open('/proc/{}/stat'.format(pid), 'r') as f:
+            stat = f.read()
+    except IOError:
+        return 0.0
+    fields = stat[stat.rfind(')') + 2:].split()
+    return (int(fields[11]) + int(fields[12])) / float(clock_ticks)
+
+
+class LogTail:
+    """
+    Follows the log of a running action: every update only reads what has
+    been appended since the previous update and passes the complete lines
+    to a progress monitor.
+    """
+    def __init__(self, filename, tool):
+        self.filename = filename
+        self.offset = 0
+        self.line = ''
+        self.progress = ProgressMonitor(tool)
+        self.description = ''
+
+    def update(self):
+        try:
+            with open(self.filename, 'r') as f:
+                f.seek(self.offset)
+                chunk = f.read(max_read)
+        except IOError:
+            return
+        self.offset += len(chunk)
+        lines = (self.line + chunk).split('\n')
+        self.line = lines.pop()
+        for l in lines:
+            description = self.progress(l)
+            if description:
+                self.description = description
+
+
+class StatusMonitor:
+    """
+    Periodically collects the status of the runs that the journal lists
+    as active: the current action, the elapsed time and the median time
+    of previous runs, the progress parsed from the log, the CPU use and
+    resident memory of the tools (for runs on this machine) and an
+    estimate of the remaining time. The status is written to a JSON file
+    and served over HTTP on localhost if a port is given.
+    The monitor runs as a separate process with a low priority and only
+    reads the journal, the results index, the tails of the logs and /proc,
+    such that it does not disturb the measurements.
+    """
+    def __init__(self, run_actions, filename = 'runs/status.json', interval = 5):
+        self.run_actions = run_actions
+        self.filename = filename
+        self.interval = interval
+        self.journal = Journal()
+        self.host = socket.gethostname()
+        self.tails = {}
+        self.cpu_samples = {}
+        self.history = {}
+        self.status = {}
+        self.lock = threading.Lock()
+
+    def get_actions(self, run_dir):
+        for actions in self.run_actions.values():
+            if any(os.path.isfile('{}/{}.log'.format(run_dir, action)) for action in actions):
+                return actions
+        return []
+
+    def get_current_action(self, run_dir, actions):
+        """
+        Returns the index of the action that is running: the last action
+        with a log, if it has no result yet.
+        """
+        current = None
+        for (i, action) in enumerate(actions):
+            if os.path.isfile('{}/{}.log'.format(run_dir, action)):
+                current = i
+        if current is None or os.path.isfile('{}/{}.result'.format(run_dir, actions[current])):
+            return None
+        return current
+
+    def get_median(self, index, name, cores, action):
+        key = (name, cores, action)
+        if not key in self.history:
+            times = [t for (status, t) in index.get_results(name, cores, action) if status == 'done']
+            self.history[key] = float(numpy.median(times)) if len(times) > 0 else None
+        return self.history[key]
+
+    def get_resources(self, event, stats, now):
+        """
+        Returns the CPU use (in cores, averaged since the previous sample)
+        and the resident memory in megabytes of the process tree of a run.
+        """
+        if event['host'] != self.host:
+            return (None, None)
+        tree = get_process_tree(event['pid'], stats)
+        cpu_time = sum(get_cpu_time(pid) for pid in tree)
+        rss = sum(get_rss(pid) for pid in tree) / 1048576.0
+        cpu = None
+        previous = self.cpu_samples.get(event['run_dir'])
+        if not previous is None and now > previous[0]:
+            cpu = max(0.0, (cpu_time - previous[1]) / (now - previous[0]))
+        self.cpu_samples[event['run_dir']] = (now, cpu_time)
+        return (cpu, rss)
+
+    def get_run_status(self, index, event, stats, now):
+        run_dir = event['run_dir']
+        name = event['name']
+        cores = event['cores']
+        actions = self.get_actions(run_dir)
+        current = self.get_current_action(run_dir, actions)
+        (cpu, rss) = self.get_resources(event, stats, now)
+        status = {
+            'name': name,
+            'cores': cores,
+            'run_dir': run_dir,
+            'host': event['host'],
+            'elapsed': now - event['time'],
+            'action': None,
+            'cpu': cpu,
+            'rss': rss
+        }
+        if current is None:
+            return status
+        action = actions[current]
+        logfile = '{}/{}.log'.format(run_dir, action)
+        key = (run_dir, action)
+        if not key in self.tails:
+            self.tails[key] = LogTail(logfile, action_tools[action])
+        tail = self.tails[key]
+        tail.update()
+        # the action started when the previous action reported its result
+        action_start = event['time']
+        if current > 0:
+            previous = '{}/{}.result'.format(run_dir, actions[current - 1])
+            if os.path.isfile(previous):
+                action_start = os.path.getmtime(previous)
+        action_elapsed = now - action_start
+        median = self.get_median(index, name, cores, action)
+        remaining = [self.get_median(index, name, cores, a) for a in actions[current + 1:]]
+        eta = None
+        if not median is None and not None in remaining:
+            eta = max(0.0, median - action_elapsed) + sum(remaining)
+        status.update({
+            'action': action,
+            'action_elapsed': action_elapsed,
+            'median': median,
+            'relative': None if not median else action_elapsed / median,
+            'progress': tail.description,
+            'statistics': tail.progress.statistics,
+            'eta': eta
+        })
+        return status
+
+    def update(self):
+        now = time.time()
+        (targets, started) = self.journal.get_state()
+        active = [event for event in started if self.journal.is_active(event)]
+        index = ResultsIndex()
+        stats = read_stats()
+        runs = [self.get_run_status(index, event, stats, now) for event in active]
+        run_dirs = set(event['run_dir'] for event in active)
+        # forget runs that have finished
+        self.tails = dict((key, tail) for (key, tail) in self.tails.items() if key[0] in run_dirs)
+        self.cpu_samples = dict((key, s) for (key, s) in self.cpu_samples.items() if key in run_dirs)
+        self.history = {}
+        status = {
+            'time': now,
+            'host': self.host,
+            'active': len(runs),
+            'runs': sorted(runs, key = lambda r: r['elapsed'], reverse = True)
+        }
+        with self.lock:
+            self.status = status
+        write_atomic(self.filename, json.dumps(status, indent=4, sort_keys=True))
+        return status
+
+    def get_status_json(self):
+        with self.lock:
+            return json.dumps(self.status, indent=4, sort_keys=True)
+
+    def serve(self, port):
+        monitor = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not self.path in ['/', '/status.json']:
+                    self.send_error(404)
+                    return
+                body = monitor.get_status_json()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', port), StatusHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        print >> sys.stderr, 'Serving status on http://127.0.0.1:{}/'.format(port)
+        return server
+
+    def run(self, port = None):
+        """
+        Updates the status every interval seconds, until interrupted.
+        """
+        # the runs have priority
+        os.nice(19)
+        if not port is None:
+            self.serve(port)
+        print >> sys.stderr, 'Writing status to', self.filename, 'every', self.interval, 'seconds.'
+        while True:
+            status = self.update()
+            print >> sys.stderr, time.strftime('%H:%M:%S'), '{} active runs'.format(status['active'])
+            time.sleep(self.interval)
@@ -0,0 +1,161 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+store.py
+
+Brief: Content-addressed store for generated artifacts (LPS and PBES files).
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import errno
+import sys
+import json
+import fcntl
+import hashlib
+import shutil
+import time
+from contextlib import contextmanager
+
+
+def make_dirs(directory):
+    """
+    Creates a directory and its parents, if they do not exist. Concurrent
+    jobs may create the same directory at the same time.
+    """
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(directory):
+            raise
+
+
+def file_checksum(filename, blocksize = 1 << 20):
+    """
+    Computes the SHA-256 checksum of the contents of a file.
+    """
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(blocksize)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def get_key(*parts):
+    """
+    Computes a key from a list of JSON serialisable parts.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(parts, sort_keys=True))
+    return h.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Stores artifacts under a key that is derived from the inputs of
+    the artifact, e.g., the checksums of the input files, the options and
+    the tool version. The manifest records the checksum, size and
+    modification time of every stored object, such that an object can be
+    validated without running a tool on it.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.manifest_filename = os.path.join(self.path, 'manifest.json')
+
+    @contextmanager
+    def locked(self, name = 'manifest'):
+        """
+        Holds an exclusive lock, shared between processes, while the block runs.
+        """
+        lock_dir = os.path.join(self.path, 'locks')
+        make_dirs(lock_dir)
+        with open(os.path.join(lock_dir, name + '.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def read_manifest(self):
+        if not os.path.isfile(self.manifest_filename):
+            return {}
+        with open(self.manifest_filename, 'r') as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest):
+        tmp_filename = self.manifest_filename + '.tmp'
+        with open(tmp_filename, 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+        os.rename(tmp_filename, self.manifest_filename)
+
+    def object_path(self, key, suffix):
+        return os.path.join(self.path, 'objects', key[:2], key + suffix)
+
+    def lookup(self, key):
+        """
+        Returns the path of the stored object for the key, or None if
+        there is no valid object.
+        """
+        with self.locked():
+            manifest = self.read_manifest()
+            entry = manifest.get(key)
+            if entry is None:
+                return None
+            filename = entry['path']
+            if os.path.isfile(filename):
+                stat = os.stat(filename)
+                if stat.st_size == entry['size'] and stat.st_mtime == entry['mtime']:
+                    return filename
+                # the file has been touched, compare the contents
+                if stat.st_size == entry['size'] and file_checksum(filename) == entry['checksum']:
+                    entry['mtime'] = stat.st_mtime
+                    self.write_manifest(manifest)
+                    return filename
+                print >> sys.stderr, 'Stored object has been modified:', filename
+                os.remove(filename)
+            del manifest[key]
+            self.write_manifest(manifest)
+            return None
+
+    def add(self, key, filename, suffix, metadata = None):
+        """
+        Moves the file into the store and returns the path of the stored object.
+        """
+        object_filename = self.object_path(key, suffix)
+        object_dir = os.path.dirname(object_filename)
+        make_dirs(object_dir)
+        checksum = file_checksum(filename)
+        shutil.move(filename, object_filename)
+        stat = os.stat(object_filename)
+        with self.locked():
+            manifest = self.read_manifest()
+            manifest[key] = {
+                'path': object_filename,
+                'checksum': checksum,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'metadata': metadata
+            }
+            self.write_manifest(manifest)
+        return object_filename
+
+    def link(self, object_filename, filename):
+        """
+        Lets filename refer to the stored object.
+        """
+        if os.path.islink(filename) and os.readlink(filename) == object_filename:
+            return
+        if os.path.lexists(filename):
+            os.remove(filename)
+        directory = os.path.dirname(filename)
+        if directory:
+            make_dirs(directory)
+        os.symlink(object_filename, filename)
@@ -0,0 +1,123 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+toolchain.py
+
+Brief: Resolves tool binaries and caches their paths and versions.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import json
+import subprocess
+import sys
+import tempfile
+
+
+def which(program):
+    """
+    Searches the PATH for an executable, like the which command.
+    """
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        filename = os.path.join(directory, program)
+        if os.path.isfile(filename) and os.access(filename, os.X_OK):
+            return filename
+    return None
+
+
+def get_version(filename):
+    """
+    Returns the first line of the output of the program with --version,
+    or None if it fails.
+    """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output([filename, '--version'], stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    lines = output.strip().split('\n')
+    return lines[0].strip()
+
+
+class ToolchainManifest:
+    """
+    Cache of resolved tool binaries: for every program, the path,
+    modification time, size and version. An entry is valid as long as
+    the binary has the recorded modification time and size, and, for
+    programs found in the PATH, the PATH is unchanged. Resolving
+    a cached program costs a single stat call.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = None
+
+    def read(self):
+        if self.entries is None:
+            self.entries = {}
+            if os.path.isfile(self.filename):
+                try:
+                    with open(self.filename, 'r') as f:
+                        self.entries = json.load(f)
+                except ValueError:
+                    print >> sys.stderr, 'Ignoring invalid toolchain manifest:', self.filename
+        return self.entries
+
+    def write(self):
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        (fd, tmp) = tempfile.mkstemp(prefix='.toolchain', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.rename(tmp, self.filename)
+
+    def is_valid(self, entry):
+        if 'search_path' in entry and entry['search_path'] != os.environ.get('PATH'):
+            return False
+        try:
+            info = os.stat(entry['path'])
+        except OSError:
+            return False
+        return info.st_mtime == entry['mtime'] and info.st_size == entry['size']
+
+    def get_entry(self, program, directory = None):
+        """
+        Returns the entry of a program in the directory, or in the PATH
+        if no directory is given. Raises an exception if the program is
+        not found.
+        """
+        entries = self.read()
+        key = program if directory is None else os.path.join(directory, program)
+        entry = entries.get(key)
+        if not entry is None and self.is_valid(entry):
+            return entry
+        if directory is None:
+            filename = which(program)
+        else:
+            filename = os.path.join(directory, program)
+        if filename is None or not os.path.isfile(filename):
+            raise Exception('{} not found.'.format(program))
+        info = os.stat(filename)
+        entry = {
+            'program': program,
+            'path': os.path.abspath(filename),
+            'mtime': info.st_mtime,
+            'size': info.st_size,
+            'version': get_version(filename)
+        }
+        if directory is None:
+            entry['search_path'] = os.environ.get('PATH')
+        print >> sys.stderr, 'Found {}: {} ({})'.format(program, entry['path'], entry['version'])
+        # re-read, other processes may have added entries
+        self.entries = None
+        entries = self.read()
+        entries[key] = entry
+        self.write()
+        return entry
+
+    def get_entries(self, programs, directory = None):
+        return dict((program, self.get_entry(program, directory)) for program in programs)
@@ -12,49 +12,288 @@ Author: Gijs Kant <gijskant@protonmail.com>
 
 """
 import os
+import shlex
 import shutil
+import signal
 import glob
+import itertools
+import select
+import csv
+import json
 import subprocess
 import sys
 import tempfile
 import time
 from datetime import datetime
 import traceback
+from collections import OrderedDict
 import re
 import numpy
 from humanfriendly import AutomaticSpinner, Spinner, Timer, tables, terminal
-from easyprocess import EasyProcess
+from scheduler import Job, Scheduler
+from store import ArtifactStore, file_checksum, get_key
+from results import ResultsIndex, read_result
+from logparsers import ProgressMonitor, parse_log
+from scaling import fit_growth, predict_size
+from toolchain import ToolchainManifest
+from housekeeping import RunStorage
+from workqueue import WorkQueue, get_worker_id
+from journal import Journal, write_atomic
+from placement import Placement, format_cpu_list
+from status import StatusMonitor
+from memory import MemoryMonitor
+from processes import GroupTerminator, Waiter
+from stats import bootstrap_ratio, censored_median, cliffs_delta, get_comparable, get_effect_size, get_observations, \
+    get_ratio, holm, mann_whitney_u, relative_width
 
 experiment_timeout = 10000 # seconds
+ramdisk = '/dev/shm'
+chunk_size = 64 * 1024 # bytes read from the output of a command at once
+max_line_length = 4096 # longest line of output passed to progress functions
+spinner_interval = 0.2 # seconds
+memory_interval = 0.5 # seconds between measurements of the memory use of a command
+kill_grace = 5 # seconds between SIGTERM and SIGKILL when a command is terminated
 
 
-def run_command(label, command, logfile = None, timeout = None):
+class CommandResult:
     """
-    Runs a command in a shell and returns the stdout.
+    The outcome of a command: the return code, whether it was stopped
+    because of a timeout or because it ran out of memory, the wall clock
+    time and the resource usage of the command and its descendants, as
+    reported by wait4.
+    After a timeout, end is the time of the timeout rather than the time
+    at which the command exited, which is at most kill_grace seconds later.
+    The peak memory of wait4 also covers the forked Python process before
+    it executed the command. The reported max_rss is therefore the peak
+    of wait4 minus rss_floor (see get_rss_floor), and 0 for commands that
+    stay below the floor. For commands that use more memory than the
+    floor, max_rss is at most rss_floor too low.
+    """
+    def __init__(self, return_code, timeout, limit, start, end, rusage, out_of_memory = False,
+                 memory_limit = None, peak_memory = None, terminated = None, killed = False, rss_floor = None,
+                 exited = None):
+        self.return_code = return_code
+        self.timeout = timeout
+        self.limit = limit
+        self.start = start
+        self.end = end
+        self.rusage = rusage
+        self.out_of_memory = out_of_memory
+        self.memory_limit = memory_limit
+        self.peak_memory = peak_memory
+        self.terminated = terminated
+        self.killed = killed
+        self.rss_floor = rss_floor
+        self.exited = end if exited is None else exited
+
+    def get_metrics(self):
+        metrics = {
+            'wall_time': self.end - self.start,
+            'user_time': self.rusage.ru_utime,
+            'system_time': self.rusage.ru_stime,
+            'wait4_max_rss': self.rusage.ru_maxrss, # kilobytes, includes the forked Python process
+            'minor_faults': self.rusage.ru_minflt,
+            'major_faults': self.rusage.ru_majflt,
+            'voluntary_switches': self.rusage.ru_nvcsw,
+            'involuntary_switches': self.rusage.ru_nivcsw
+        }
+        rss_floor = 0 if self.rss_floor is None else self.rss_floor
+        metrics['rss_floor'] = rss_floor # kilobytes
+        metrics['max_rss'] = max(self.rusage.ru_maxrss - rss_floor, 0) # kilobytes
+        if not self.limit is None:
+            metrics['time_limit'] = self.limit
+        if not self.memory_limit is None:
+            metrics['memory_limit'] = self.memory_limit # megabytes
+            metrics['max_tree_rss'] = self.peak_memory / 1024 # kilobytes, sampled
+        if not self.terminated is None:
+            # time between the timeout and the exit of the command
+            metrics['termination_delay'] = self.exited - self.terminated
+            metrics['killed'] = int(self.killed)
+        return metrics
+
+
+rss_floor = None
+
+
+def get_rss_floor():
+    """
+    Returns the peak memory in kilobytes that wait4 reports for a command
+    that uses almost no memory, started in the same way as by run_command.
+    This is the memory of the forked Python process before it executes
+    the command. It is measured once per process.
+    """
+    global rss_floor
+    if rss_floor is None:
+        with open(os.devnull, 'w') as devnull:
+            process = subprocess.Popen(['true'], stdout=devnull, stderr=devnull, preexec_fn=os.setsid)
+            (pid, exit_status, rusage) = os.wait4(process.pid, 0)
+            process.returncode = exit_status
+        rss_floor = rusage.ru_maxrss
+    return rss_floor
+
+
+def run_command(label, command, logfile = None, timeout = None, progress = None, memory_limit = None):
+    """
+    Runs a command and returns a CommandResult. The output of the command
+    is copied to the logfile in chunks while it runs, such that memory use
+    does not depend on the size of the output. Every complete line of
+    output is passed to the progress function, which may return a
+    description of the progress to show next to the label.
+    The command runs in a session and process group of its own. After
+    timeout seconds, the group gets SIGTERM, and SIGKILL if it is still
+    running kill_grace seconds later. The command is killed when the
+    resident memory of the command and its descendants exceeds
+    memory_limit megabytes. The function returns when all processes of
+    the group have exited, and the end time is the time at which the
+    command exited.
     """
     print >> sys.stderr, '-', command
-    with AutomaticSpinner(label) as spinner:
-        start =  time.time()
-        if timeout is None:
-            proc = EasyProcess(command).call()
+    with Spinner(label=label, timer=Timer()) as spinner:
+        if logfile is None:
+            log = open(os.devnull, 'w')
+        else:
+            # unbuffered, such that the log is complete if the script crashes
+            log = open(logfile, 'a', 0)
+            log.write(command + '\n')
+        rss_floor = get_rss_floor()
+        start = time.time()
+        process = subprocess.Popen(shlex.split(command), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   preexec_fn=os.setsid)
+        waiter = Waiter(process.pid)
+        waiter.start()
+        group = GroupTerminator(process.pid, kill_grace)
+        monitor = None
+        if not memory_limit is None:
+            monitor = MemoryMonitor(process.pid, memory_limit * 1024 * 1024, memory_interval)
+        fd = process.stdout.fileno()
+        line = ''
+        status = label
+        eof = False
+        timed_out = False
+        terminated = None
+        try:
+            while True:
+                if not eof:
+                    (ready, _, _) = select.select([fd], [], [], spinner_interval)
+                    if len(ready) > 0:
+                        chunk = os.read(fd, chunk_size)
+                        if not chunk:
+                            eof = True
+                        log.write(chunk)
+                        if not progress is None:
+                            lines = (line + chunk).split('\n')
+                            # keep at most one line, and pass lines, of bounded length
+                            line = lines.pop()[-max_line_length:]
+                            for l in lines:
+                                description = progress(l[:max_line_length])
+                                if description:
+                                    status = '{} ({})'.format(label, description)
+                else:
+                    time.sleep(spinner_interval)
+                if waiter.end is None:
+                    if not timeout is None and not timed_out and time.time() - start >= timeout:
+                        timed_out = True
+                        group.terminate()
+                        terminated = group.terminated
+                    if not monitor is None:
+                        monitor.check()
+                else:
+                    if group.is_gone():
+                        break
+                    if group.terminated is None:
+                        # descendants that outlive the command would disturb the next run
+                        print >> sys.stderr, 'Terminating processes left by the command.'
+                        group.terminate()
+                group.escalate()
+                spinner.step(label=status)
+        except:
+            group.kill()
+            raise
+        # output of processes that escaped from the group
+        while not eof and len(select.select([fd], [], [], 0)[0]) > 0:
+            chunk = os.read(fd, chunk_size)
+            eof = not chunk
+            log.write(chunk)
+        process.stdout.close()
+        exited = waiter.end
+        exit_status = waiter.status
+        rusage = waiter.rusage
+        log.close()
+        if os.WIFSIGNALED(exit_status):
+            return_code = -os.WTERMSIG(exit_status)
         else:
-            proc = EasyProcess(command).call(timeout=timeout)
-        if not proc.return_code == 0:
-            if proc.return_code == -15:
+            return_code = os.WEXITSTATUS(exit_status)
+        process.returncode = return_code
+        # the command may have finished just before the timeout signal
+        timed_out = timed_out and return_code != 0
+        # the time spent terminating the command is not part of its time
+        end = terminated if timed_out else exited
+        # killed by the monitor, or by the kernel when the machine ran out of memory
+        out_of_memory = not timed_out and ((not monitor is None and monitor.exceeded) or
+                                           return_code == -signal.SIGKILL)
+        if not return_code == 0:
+            if timed_out:
                 print >> sys.stderr, 'Timeout'
-                return False
+            elif out_of_memory:
+                print >> sys.stderr, 'Out of memory'
             else:
-                raise Exception('Command failed: ' + str(proc.return_code))
+                raise Exception('Command failed: ' + str(return_code))
+        print >> sys.stderr, '  ({:.2f} seconds, {:.2f} user, {:.2f} system)'.format(
+            (end - start), rusage.ru_utime, rusage.ru_stime)
+        peak_memory = None if monitor is None else monitor.peak
+        return CommandResult(return_code, timed_out, timeout, start, end, rusage, out_of_memory,
+                             memory_limit, peak_memory, terminated if timed_out else None, group.killed, rss_floor,
+                             exited)
+
+
+def run_pipeline(label, commands, output_filename, logfile = None):
+    """
+    Runs commands in a pipeline, connecting the stdout of each command to
+    the stdin of the next, and writes the stdout of the last command to
+    output_filename. Returns for every command the number of seconds
+    between the start of the pipeline and the end of the command.
+    """
+    print >> sys.stderr, '-', ' | '.join(commands), '>', output_filename
+    with AutomaticSpinner(label) as spinner:
+        processes = []
+        logs = []
+        start = time.time()
+        with open(output_filename, 'wb') as output:
+            stdin = None
+            for i, command in enumerate(commands):
+                if i == len(commands) - 1:
+                    stdout = output
+                else:
+                    stdout = subprocess.PIPE
+                log = tempfile.TemporaryFile()
+                process = subprocess.Popen(command, shell=True, stdin=stdin, stdout=stdout, stderr=log)
+                if not stdin is None:
+                    # only the next command should hold the read end of the pipe
+                    stdin.close()
+                stdin = process.stdout
+                processes.append(process)
+                logs.append(log)
+            times = [None] * len(processes)
+            while None in times:
+                for i, process in enumerate(processes):
+                    if times[i] is None and not process.poll() is None:
+                        times[i] = time.time() - start
+                time.sleep(0.01)
         if not logfile is None:
             f = open(logfile, 'a')
-            f.write(command)
-            f.write('\n')
-            if not proc.stderr is None:
-                f.write(proc.stderr)
+            for command, log in zip(commands, logs):
+                f.write(command)
+                f.write('\n')
+                log.seek(0)
+                shutil.copyfileobj(log, f)
             f.close()
-        end = time.time()
-        print >> sys.stderr, '  ({:.2f} seconds)'.format((end - start))
-        return True
+        for log in logs:
+            log.close()
+        for command, process, t in zip(commands, processes, times):
+            print >> sys.stderr, '  {} ({:.2f} seconds)'.format(os.path.basename(command.split()[0]), t)
+            if not process.returncode == 0:
+                raise Exception('Command failed: ' + str(process.returncode))
+        return times
 
 
 def run_simple_command(command):
@@ -83,20 +322,89 @@ def get_model_name(filename):
     return os.path.splitext(os.path.basename(filename))[0]
 
 
-def create_tempfile(filename, suffix):
+def create_tempfile(filename, suffix, directory = None):
     modelname = get_model_name(filename)
-    (f, filename) = tempfile.mkstemp(suffix, modelname + '.')
+    (f, filename) = tempfile.mkstemp(suffix, modelname + '.', directory)
+    os.close(f)
     return filename
 
 
-def get_path_from_config(config, tool):
+def get_free_space(directory):
+    """
+    Returns the number of bytes available in the file system of directory.
+    """
+    stat = os.statvfs(directory)
+    return stat.f_bavail * stat.f_frsize
+
+
+def get_option_from_config(config, tool, option, default = None):
     c = config.get('tools')
     if c is None:
-        return None
+        return default
     t = c.get(tool)
     if t is None:
+        return default
+    return t.get(option, default)
+
+
+def get_path_from_config(config, tool):
+    return get_option_from_config(config, tool, 'path')
+
+
+# options of pbes2lts-sym and spgsolver that can be varied in the run options
+run_option_defaults = OrderedDict([
+    ('rewriter', 'jitty'),
+    ('regroup', 'gs'),
+    ('vset', 'lddmc'),
+    ('order', 'par-prev'),
+    ('attr', 'par')
+])
+
+
+def get_option_combinations(run_options):
+    """
+    Returns all combinations of the tool options in the run options,
+    where an option can be a single value or a list of values.
+    """
+    values = []
+    for option, default in run_option_defaults.items():
+        value = run_options.get(option, default)
+        if not isinstance(value, list):
+            value = [value]
+        values.append(value)
+    return [OrderedDict(zip(run_option_defaults.keys(), combination))
+            for combination in itertools.product(*values)]
+
+
+def get_options_label(options):
+    """
+    Describes the options that differ from the defaults, e.g.,
+    'vset=sylvan,order=bfs-prev'.
+    """
+    return ','.join('{}={}'.format(option, value) for option, value in options.items()
+                    if value != run_option_defaults[option])
+
+
+def get_variant_name(name, options):
+    """
+    Returns the name of a run of an experiment with the options. The name of
+    a run with the default options is the name of the experiment.
+    """
+    label = get_options_label(options)
+    if label == '':
+        return name
+    return '{}@{}'.format(name, label)
+
+
+def get_toolchain_manifest(config):
+    return ToolchainManifest(config.get('toolchain_manifest', '.toolchain.json'))
+
+
+def get_configured_path(config, tool):
+    path = get_path_from_config(config, tool)
+    if path is None:
         return None
-    return t.get('path')
+    return os.path.abspath(path)
 
 
 def prepare_output_dir(name, cores, timestamp):
@@ -109,54 +417,46 @@ def get_run_dirs(name, cores):
     return glob.glob('runs/{}/{}/*'.format(name, cores))
 
 
-def is_pbes2spg_run(output_dir):
-    return os.path.isfile(output_dir + '/pbes2spg.result')
-
-
-def is_spgsolver_run(output_dir):
-    return os.path.isfile(output_dir + '/spgsolver.result')
-
-
-def is_pbes2spg_timeout(output_dir):
-    pattern = re.compile('^Timeout after (\d+\.\d*) seconds.')
-    with open(output_dir + '/pbes2spg.result') as f:
-        for l in f:
-            m = pattern.match(l)
-            if not m is None:
-                return True
-    return False
-
-
-def is_spgsolver_timeout(output_dir):
-    pattern = re.compile('^Timeout after (\d+\.\d*) seconds.')
-    with open(output_dir + '/spgsolver.result') as f:
-        for l in f:
-            m = pattern.match(l)
-            if not m is None:
-                return True
-    return False
+def get_toolchain_versions(run_dir):
+    """
+    Returns the paths and versions of the programs in the toolchain.json
+    of a run directory.
+    """
+    toolchain_file = '{}/toolchain.json'.format(run_dir)
+    if not os.path.isfile(toolchain_file):
+        return []
+    with open(toolchain_file, 'r') as f:
+        toolchain = json.load(f)
+    return [entry[key] for entry in toolchain.values() for key in ['path', 'version'] if entry.get(key)]
 
 
-def get_pbes2spg_time(output_dir):
-    pattern = re.compile('^Instantiating took (\d+\.\d*) seconds.')
-    with open(output_dir + '/pbes2spg.result') as f:
-        for l in f:
-            m = pattern.match(l)
-            if not m is None:
-                t = m.group(1)
-                return float(t)
-    return None
+def select_run_dirs(selection, name, cores):
+    """
+    Returns the run directories of a result set: if the selection is a
+    directory, the runs in that directory, which has the layout of the
+    runs directory; otherwise the runs in the runs directory of which the
+    path or version of a program contains the selection.
+    """
+    if os.path.isdir(selection):
+        return glob.glob(os.path.join(selection, name, str(cores), '*'))
+    return [run_dir for run_dir in get_run_dirs(name, cores)
+            if any(selection in value for value in get_toolchain_versions(run_dir))]
 
 
-def get_spgsolver_time(output_dir):
-    pattern = re.compile('^Solving took (\d+\.\d*) seconds.')
-    with open(output_dir + '/spgsolver.result') as f:
-        for l in f:
-            m = pattern.match(l)
-            if not m is None:
-                t = m.group(1)
-                return float(t)
-    return None
+def read_results(run_dirs, action):
+    """
+    Returns the (status, time) results of an action in the run directories.
+    """
+    results = []
+    for run_dir in run_dirs:
+        try:
+            result = read_result(run_dir, action)
+        except Exception as e:
+            print >> sys.stderr, 'Skipping run directory {}: {}'.format(run_dir, e)
+            continue
+        if not result is None:
+            results.append(result)
+    return results
 
 
 def get_summary(properties, data):
@@ -169,7 +469,261 @@ def get_summary(properties, data):
     return properties + [n, mean, stdev]
 
 
+def get_throughput_summary(properties, metrics):
+    """
+    Summarises the size of the explored state space and the number of
+    states and decision diagram nodes per second, if the log contained
+    these statistics. Returns None otherwise. The node columns are empty
+    for explicit state tools.
+    """
+    metrics = [m for m in metrics if 'states' in m]
+    n = len(metrics)
+    if n == 0:
+        return None
+    def mean(key, per_second = False):
+        if not all(key in m for m in metrics):
+            return None
+        if per_second:
+            return '{:.2f}'.format(numpy.mean([m[key] / m['wall_time'] for m in metrics]))
+        return '{:.2f}'.format(numpy.mean([m[key] for m in metrics]))
+    return properties + [
+        n,
+        mean('states'),
+        mean('nodes'),
+        mean('states', True),
+        mean('nodes', True)
+    ]
+
+
+def get_resource_summary(properties, metrics, cores):
+    """
+    Summarises the resource usage of runs: mean CPU times, peak memory,
+    context switches and CPU utilisation, i.e., the CPU time divided by
+    the wall clock time and the number of cores. Unlike the efficiency in
+    the speedup table, it does not depend on a base run.
+    """
+    n = len(metrics)
+    if n == 0:
+        return properties + [n] + [None] * 6
+    def mean(key, scale = 1.0):
+        return '{:.2f}'.format(numpy.mean([m[key] for m in metrics]) / scale)
+    utilisation = numpy.mean([(m['user_time'] + m['system_time']) / (m['wall_time'] * cores) for m in metrics])
+    return properties + [
+        n,
+        mean('user_time'),
+        mean('system_time'),
+        mean('max_rss', 1024.0),
+        mean('voluntary_switches'),
+        mean('involuntary_switches'),
+        '{:.2f}'.format(utilisation)
+    ]
+
+
+def get_speedups(name, action, observations):
+    """
+    Computes the speedup and parallel efficiency of every number of cores
+    relative to the smallest number of cores (usually 1), from the median
+    times of the runs. Timeouts are censored observations, hence the
+    speedup can be a bound. Returns a list of records.
+    """
+    if len(observations) < 2:
+        return []
+    base_cores = min(observations.keys())
+    base = observations[base_cores]
+    base_median = censored_median(base)
+    records = []
+    for cores in sorted(observations.keys()):
+        if cores == base_cores:
+            continue
+        median = censored_median(observations[cores])
+        (speedup, bound) = get_ratio(base_median, median)
+        interval = bootstrap_ratio(base, observations[cores])
+        scale = float(base_cores) / cores
+        record = OrderedDict([
+            ('name', name),
+            ('action', action),
+            ('base_cores', base_cores),
+            ('cores', cores),
+            ('base_n', len(base)),
+            ('base_timeouts', len([o for o in base if o[1]])),
+            ('base_median', base_median[0]),
+            ('base_censored', base_median[1]),
+            ('n', len(observations[cores])),
+            ('timeouts', len([o for o in observations[cores] if o[1]])),
+            ('median', median[0]),
+            ('censored', median[1]),
+            ('bound', bound),
+            ('speedup', speedup),
+            ('speedup_low', None if interval is None else interval[0]),
+            ('speedup_high', None if interval is None else interval[1]),
+            ('efficiency', None if speedup is None else speedup * scale),
+            ('efficiency_low', None if interval is None else interval[0] * scale),
+            ('efficiency_high', None if interval is None else interval[1] * scale)
+        ])
+        records.append(record)
+    return records
+
+
+def get_speedup_summary(record):
+    def bounded(value):
+        if value is None:
+            return None
+        prefix = '' if record['bound'] == '=' else record['bound'] + ' '
+        return prefix + '{:.2f}'.format(value)
+    def interval(low, high):
+        if low is None:
+            return None
+        return '[{:.2f}, {:.2f}]'.format(low, high)
+    def median(value, censored):
+        if value is None:
+            return None
+        return ('>= ' if censored else '') + '{:.2f}'.format(value)
+    return [
+        record['name'],
+        record['cores'],
+        '{}/{}'.format(record['n'], record['timeouts']),
+        median(record['base_median'], record['base_censored']),
+        median(record['median'], record['censored']),
+        bounded(record['speedup']),
+        interval(record['speedup_low'], record['speedup_high']),
+        bounded(record['efficiency']),
+        interval(record['efficiency_low'], record['efficiency_high'])
+    ]
+
+
+def get_ranking(experiment, cores, configurations):
+    """
+    Ranks the option configurations of an experiment with a number of cores
+    by their median time, where a censored median counts as slower than
+    all uncensored ones. The configurations are (label, observations) pairs.
+    """
+    medians = [(label, observations, censored_median(observations)) for (label, observations) in configurations]
+    medians.sort(key = lambda m: (m[2][1], m[2][0]))
+    best = medians[0][2][0]
+    rows = []
+    for rank, (label, observations, (value, censored)) in enumerate(medians):
+        relative = None
+        if best > 0 and not medians[0][2][1]:
+            relative = ('>= ' if censored else '') + '{:.2f}'.format(value / best)
+        rows.append([
+            experiment,
+            cores,
+            rank + 1,
+            label if label != '' else '(defaults)',
+            len(observations),
+            len([o for o in observations if o[1]]),
+            ('>= ' if censored else '') + '{:.2f}'.format(value),
+            relative
+        ])
+    return rows
+
+
+def get_comparison(name, cores, action, base_results, results):
+    """
+    Compares the times of an action in two result sets with the
+    Mann-Whitney U test and Cliff's delta, where a positive delta means
+    that the second set is slower. Timeouts count as slower than all
+    completed runs. Returns a record.
+    """
+    base = get_observations(base_results)
+    observations = get_observations(results)
+    base_median = censored_median(base)
+    median = censored_median(observations)
+    (ratio, bound) = get_ratio(median, base_median)
+    x = get_comparable(observations)
+    y = get_comparable(base)
+    (u, p) = mann_whitney_u(x, y)
+    delta = cliffs_delta(x, y)
+    return OrderedDict([
+        ('name', name),
+        ('action', action),
+        ('cores', cores),
+        ('base_n', len(base)),
+        ('base_timeouts', len([o for o in base if o[1]])),
+        ('base_median', base_median[0]),
+        ('base_censored', base_median[1]),
+        ('n', len(observations)),
+        ('timeouts', len([o for o in observations if o[1]])),
+        ('median', median[0]),
+        ('censored', median[1]),
+        ('bound', bound),
+        ('ratio', ratio),
+        ('u', u),
+        ('p', p),
+        ('delta', delta),
+        ('effect', get_effect_size(delta))
+    ])
+
+
+def get_comparison_summary(record):
+    def median(value, censored):
+        if value is None:
+            return None
+        return ('>= ' if censored else '') + '{:.2f}'.format(value)
+    def probability(value):
+        if value is None:
+            return None
+        return '{:.4f}'.format(value)
+    ratio = None
+    if not record['ratio'] is None:
+        ratio = ('' if record['bound'] == '=' else record['bound'] + ' ') + '{:.2f}'.format(record['ratio'])
+    delta = None
+    if not record['delta'] is None:
+        delta = '{:+.2f} ({})'.format(record['delta'], record['effect'])
+    return [
+        record['name'],
+        record['cores'],
+        '{}/{}'.format(record['base_n'], record['base_timeouts']),
+        '{}/{}'.format(record['n'], record['timeouts']),
+        median(record['base_median'], record['base_censored']),
+        median(record['median'], record['censored']),
+        ratio,
+        probability(record['p']),
+        probability(record['p_adjusted']),
+        delta,
+        record['verdict']
+    ]
+
+
+def write_records(filename, records):
+    """
+    Writes records to a CSV file or, if the filename ends with '.json',
+    to a JSON file.
+    """
+    with open(filename, 'w') as f:
+        if filename.endswith('.json'):
+            json.dump(records, f, indent=4, separators=(',', ': '))
+            f.write('\n')
+        else:
+            writer = csv.writer(f)
+            if len(records) > 0:
+                writer.writerow(records[0].keys())
+            for record in records:
+                writer.writerow(['' if v is None else v for v in record.values()])
+    print >> sys.stderr, 'Written {} records to'.format(len(records)), filename
+
+
 class Tool:
+
+    # the section in the config file and a program to locate the tool by
+    name = None
+    test_program = None
+    path = None
+
+    def get_path(self):
+        """
+        Returns the directory of the binaries of the tool, which is
+        resolved when a binary is needed for the first time.
+        """
+        if self.path is None:
+            entry = self.toolchain.get_entry(self.test_program, self.configured_path)
+            self.path = os.path.dirname(entry['path']) + '/'
+            print >> sys.stderr, '{} path:'.format(self.name), self.path
+        return self.path
+
+    def get_toolchain(self, programs):
+        return self.toolchain.get_entries(programs, self.get_path())
+
     def prepare(self, data):
         pass
 
@@ -188,28 +742,20 @@ class Tool:
 
 class Mcrl2(Tool):
 
-    path = ""
+    name = 'mcrl2'
+    test_program = 'mcrl22lps'
+    version = None
 
     def __init__(self, config):
-        path = get_path_from_config(config, 'mcrl2')
-        if path is None:
-            self.path = self.find_path()
-        else:
-            self.path = os.path.abspath(path)
-        self.path += '/'
-        print >> sys.stderr, 'mcrl2 path:', self.path
-        test_program = self.path + 'mcrl22lps'
-        if not os.path.isfile(test_program):
-            raise Exception('mcrl22lps not found.')
-
-    def find_path(self):
-        path = run_simple_command('which mcrl22lps')
-        mcrl2_dir = os.path.dirname(os.path.abspath(path))
-        print >> sys.stderr, 'Found mcrl2 binary in path: ', path,
-        return mcrl2_dir
+        self.configured_path = get_configured_path(config, 'mcrl2')
+        self.toolchain = get_toolchain_manifest(config)
+        self.store = ArtifactStore(config.get('store', 'store'))
+        self.staging = get_option_from_config(config, 'mcrl2', 'staging', 'disk')
+        assert self.staging in ['disk', 'tmpfs', 'pipe']
+        self.tmpfs_reserve = get_option_from_config(config, 'mcrl2', 'tmpfs_reserve', 1024) * 1024 * 1024
 
     def check_pbes(self, pbes_filename):
-        command = self.path + 'pbesinfo {pbes_filename}'.format(pbes_filename = pbes_filename)
+        command = self.get_path() + 'pbesinfo {pbes_filename}'.format(pbes_filename = pbes_filename)
         result = run_boolean_command(command)
         return result == 0
 
@@ -221,14 +767,14 @@ class Mcrl2(Tool):
         lps2pbes_options = preparation_options['lps2pbes']
 
         # lps2pbes
-        command = self.path + 'lps2pbes -v {lps2pbes_options} -f {input_mcf} {lps_filename} {pbes_filename}'.format(
+        command = self.get_path() + 'lps2pbes -v {lps2pbes_options} -f {input_mcf} {lps_filename} {pbes_filename}'.format(
             lps2pbes_options = lps2pbes_options,
             input_mcf = input_mcf,
             lps_filename = lps_filename,
             pbes_filename = pbes_filename
         )
         # redirect log messages
-        logfile = '{pbes_filename}.lps2pbes.log'.format(pbes_filename = pbes_filename)
+        logfile = self.get_pbes_logfile(data)
         try:
             print >> sys.stderr, ''
             start = time.time()
@@ -243,12 +789,31 @@ class Mcrl2(Tool):
             sys.exit(1)
 
     def check_lps(self, lps_filename):
-        command = self.path + 'lpsinfo {lps_filename}'.format(lps_filename = lps_filename)
+        command = self.get_path() + 'lpsinfo {lps_filename}'.format(lps_filename = lps_filename)
         result = run_boolean_command(command)
         return result == 0
 
-    def generate_lps(self, data):
-        lps_filename = data['lps_filename']
+    def get_staging_dir(self, lps_in):
+        """
+        Returns the directory for the next intermediate LPS: the RAM disk
+        in 'tmpfs' mode, as long as it has room for the reserve plus twice
+        the size of the previous intermediate, and the default
+        temporary directory otherwise.
+        """
+        if self.staging == 'tmpfs' and os.path.isdir(ramdisk):
+            required = self.tmpfs_reserve
+            if os.path.isfile(lps_in):
+                required += 2 * os.path.getsize(lps_in)
+            if get_free_space(ramdisk) >= required:
+                return ramdisk
+            print >> sys.stderr, 'Not enough space in {}, using the default temporary directory.'.format(ramdisk)
+        return None
+
+    def get_lps_stages(self, data):
+        """
+        Returns the tool chain for generating the LPS as a list of
+        commands without input and output files.
+        """
         input_mcrl2 = data['input_mcrl2']
         preparation_options = data['preparation_options']
         lin_options = preparation_options['linearisation']
@@ -256,8 +821,25 @@ class Mcrl2(Tool):
         if parunfold_steps is None:
             parunfold_steps = []
 
+        stages = []
+        stages.append(('Linearising', 'mcrl22lps -v {lin_options} {input_mcrl2}'.format(
+            lin_options = lin_options,
+            input_mcrl2 = input_mcrl2
+        )))
+        stages.append(('lpssuminst', 'lpssuminst'))
+        for step in parunfold_steps:
+            stages.append(('lpsparunfold', 'lpsparunfold -v {options}'.format(options = step)))
+        stages.append(('lpsrewr', 'lpsrewr -v'))
+        stages.append(('lpsconstelm', 'lpsconstelm -v -c'))
+        return stages
+
+    def generate_lps(self, data):
+        lps_filename = data['lps_filename']
+        input_mcrl2 = data['input_mcrl2']
+        stages = self.get_lps_stages(data)
+
         # redirect log messages
-        logfile = '{lps_filename}.log'.format(lps_filename = lps_filename)
+        logfile = self.get_lps_logfile(data)
 
         lps_in = ""
         lps_out = ""
@@ -266,47 +848,21 @@ class Mcrl2(Tool):
             print >> sys.stderr, ''
             start = time.time()
 
-            # linearisation
-            lps_out = create_tempfile(lps_filename, '.lps')
-            command = self.path + 'mcrl22lps -v {lin_options} {input_mcrl2} {lps_out}'.format(
-                lin_options = lin_options,
-                input_mcrl2 = input_mcrl2,
-                lps_out = lps_out
-            )
-            run_command('Linearising ' + input_mcrl2, command, logfile)
-
-            # lpssuminst
-            lps_in = lps_out
-            lps_out = create_tempfile(lps_filename, '.lps')
-            command = self.path + 'lpssuminst {lps_in} {lps_out}'.format(lps_in = lps_in, lps_out = lps_out)
-            run_command('lpssuminst ' + input_mcrl2, command, logfile)
-            os.remove(lps_in)
-
-            # parunfold
-            for step in parunfold_steps:
-                lps_in = lps_out
-                lps_out = create_tempfile(lps_filename, '.lps')
-                command = self.path + 'lpsparunfold -v {options} {lps_in} {lps_out}'.format(
-                    options = step,
-                    lps_in = lps_in,
-                    lps_out = lps_out
-                )
-                data = run_command('lpsparunfold ' + input_mcrl2, command, logfile)
-                os.remove(lps_in)
-
-            # rewrite
-            lps_in = lps_out
-            lps_out = create_tempfile(lps_filename, '.lps')
-            command = self.path + 'lpsrewr -v {lps_in} {lps_out}'.format(lps_in = lps_in, lps_out = lps_out)
-            run_command('lpsrewr ' + input_mcrl2, command, logfile)
-            os.remove(lps_in)
-
-            # constelm
-            lps_in = lps_out
-            lps_out = create_tempfile(lps_filename, '.lps')
-            command = self.path + 'lpsconstelm -v -c {lps_in} {lps_out}'.format(lps_in = lps_in, lps_out = lps_out)
-            run_command('lpsconstelm ' + input_mcrl2, command, logfile)
-            os.remove(lps_in)
+            if self.staging == 'pipe':
+                # the tools read from stdin and write to stdout if no files are given
+                lps_out = create_tempfile(lps_filename, '.lps', os.path.dirname(os.path.abspath(lps_filename)))
+                commands = [self.get_path() + command for (label, command) in stages]
+                run_pipeline('Generating ' + lps_filename, commands, lps_out, logfile)
+            else:
+                for (label, command) in stages:
+                    lps_out = create_tempfile(lps_filename, '.lps', self.get_staging_dir(lps_in))
+                    if os.path.isfile(lps_in):
+                        command += ' ' + lps_in
+                    command = self.get_path() + command + ' ' + lps_out
+                    run_command(label + ' ' + input_mcrl2, command, logfile)
+                    if os.path.isfile(lps_in):
+                        os.remove(lps_in)
+                    lps_in = lps_out
 
             # move output to lps_filename
             shutil.move(lps_out, lps_filename)
@@ -322,62 +878,162 @@ class Mcrl2(Tool):
                 os.remove(lps_out)
             sys.exit(1)
 
+    def get_version(self):
+        if self.version is None:
+            self.version = self.get_toolchain(['mcrl22lps'])['mcrl22lps']['version']
+        return self.version
+
+    def get_lps_key(self, data):
+        preparation_options = data['preparation_options']
+        return get_key(
+            'lps',
+            file_checksum(data['input_mcrl2']),
+            preparation_options['linearisation'],
+            preparation_options.get('lpsparunfold'),
+            self.get_version()
+        )
+
+    def get_pbes_key(self, data):
+        return get_key(
+            'pbes',
+            self.get_lps_key(data),
+            file_checksum(data['input_mcf']),
+            data['preparation_options'],
+            self.get_version()
+        )
+
+    def prepare_artifact(self, kind, filename, key, check, generate, data, logfile):
+        """
+        Links filename to the stored artifact for key, generating and
+        storing the artifact if it is not in the store yet.
+        """
+        # prevents other processes from generating the same artifact
+        with self.store.locked(key):
+            self.prepare_locked_artifact(kind, filename, key, check, generate, data, logfile)
+
+    def prepare_locked_artifact(self, kind, filename, key, check, generate, data, logfile):
+        suffix = '.' + kind.lower()
+        object_filename = self.store.lookup(key)
+        if not object_filename is None:
+            print >> sys.stderr, 'Existing {} found:'.format(kind), filename
+            self.store.link(object_filename, filename)
+            return
+        if os.path.isfile(filename) and not os.path.islink(filename):
+            # generated before the store was used, validate once
+            if check(filename):
+                print >> sys.stderr, 'Adding existing {} to the store:'.format(kind), filename
+                object_filename = self.store.add(key, filename, suffix, {'name': filename})
+                self.store.link(object_filename, filename)
+                return
+            print >> sys.stderr, 'Found invalid {}:'.format(kind), filename
+        if os.path.lexists(filename):
+            os.remove(filename)
+
+        generate(data)
+        if not os.path.isfile(filename):
+            raise Exception('Error creating {}: {}'.format(kind, filename))
+        statistics = parse_log(logfile)
+        for tool, values in statistics.items():
+            for metric, value in sorted(values.items()):
+                print >> sys.stderr, '  {}: {} = {}'.format(tool, metric, value)
+        object_filename = self.store.add(key, filename, suffix, {'name': filename, 'statistics': statistics})
+        self.store.link(object_filename, filename)
+
+    def get_lps_logfile(self, data):
+        return '{lps_filename}.log'.format(lps_filename = data['lps_filename'])
+
+    def get_pbes_logfile(self, data):
+        return '{pbes_filename}.lps2pbes.log'.format(pbes_filename = data['pbes_filename'])
+
+    def prepare_lps(self, data):
+        self.prepare_artifact('LPS', data['lps_filename'], self.get_lps_key(data),
+                              self.check_lps, self.generate_lps, data, self.get_lps_logfile(data))
+
+    def prepare_pbes(self, data):
+        self.prepare_artifact('PBES', data['pbes_filename'], self.get_pbes_key(data),
+                              self.check_pbes, self.generate_pbes, data, self.get_pbes_logfile(data))
+
     def prepare(self, data):
         experiment_type = data['type']
         assert experiment_type in ['lps', 'pbes']
 
-        # check if an invalid LPS exists
-        lps_filename = data['lps_filename']
-        if os.path.isfile(lps_filename):
-            if not self.check_lps(lps_filename):
-                print >> sys.stderr, 'Found invalid LPS:', lps_filename
-                os.remove(lps_filename)
-
-        # generate lps if not exists
-        if not os.path.isfile(lps_filename):
-            self.generate_lps(data)
-        else:
-            print >> sys.stderr, 'Existing LPS found:', lps_filename
-        if not os.path.isfile(lps_filename):
-            raise Exception('Error creating LPS: ' + lps_filename)
+        self.prepare_lps(data)
 
         if not experiment_type == 'pbes':
             return
 
-        # check if an invalid PBES exists
-        pbes_filename = data['pbes_filename']
-        if os.path.isfile(pbes_filename):
-            if not self.check_pbes(pbes_filename):
-                print >> sys.stderr, 'Found invalid PBES:', pbes_filename
-                os.remove(pbes_filename)
-
-        # generate pbes if not exists
-        if not os.path.isfile(pbes_filename):
-            self.generate_pbes(data)
-        else:
-            print >> sys.stderr, 'Existing PBES found:', pbes_filename
-        if not os.path.isfile(pbes_filename):
-            raise Exception('Error creating PBES: ' + pbes_filename)
+        self.prepare_pbes(data)
+
+    def prepare_group(self, prepare, group):
+        for data in group:
+            prepare(data)
+
+    def prepare_all(self, experiments, max_workers = None):
+        """
+        Prepares all experiments. Experiments that share an artifact are
+        grouped, such that every artifact is generated once. Artifacts that
+        do not depend on each other are generated concurrently.
+        """
+        lps_groups = OrderedDict()
+        pbes_groups = OrderedDict()
+        for data in experiments:
+            experiment_type = data['type']
+            assert experiment_type in ['lps', 'pbes']
+            lps_key = self.get_lps_key(data)
+            lps_groups.setdefault(lps_key, []).append(data)
+            if experiment_type == 'pbes':
+                pbes_groups.setdefault((lps_key, self.get_pbes_key(data)), []).append(data)
+
+        scheduler = Scheduler(max_workers)
+        lps_jobs = {}
+        for lps_key, group in lps_groups.items():
+            job = Job('LPS ' + group[0]['lps_filename'], self.prepare_group, (self.prepare_lps, group))
+            lps_jobs[lps_key] = job
+            scheduler.add(job)
+        for (lps_key, pbes_key), group in pbes_groups.items():
+            job = Job('PBES ' + group[0]['pbes_filename'], self.prepare_group, (self.prepare_pbes, group),
+                      dependencies = [lps_jobs[lps_key]])
+            scheduler.add(job)
+        failed = scheduler.run()
+        if len(failed) > 0:
+            raise Exception('Preparing {} artifacts failed.'.format(len(failed)))
 
 
 class Ltsmin(Tool):
+
+    name = 'ltsmin'
+    test_program = 'pbes2lts-sym'
+
+    # the tools used by a run of each type
+    run_programs = {
+        'lps': ['lps2lts-sym', 'lps2lts-mc'],
+        'pbes': ['pbes2lts-sym', 'spgsolver']
+    }
+
+    # the actions of which a run of each type reports a result
+    run_actions = {
+        'lps': ['lps2lts-sym', 'lps2lts-mc'],
+        'pbes': ['pbes2spg', 'spgsolver']
+    }
+
     def __init__(self, config):
-        path = get_path_from_config(config, 'ltsmin')
-        if path is None:
-            self.path = self.find_path()
-        else:
-            self.path = os.path.abspath(path)
-        self.path += '/'
-        print >> sys.stderr, 'ltsmin path:', self.path
-        test_program = self.path + 'pbes2lts-sym'
-        if not os.path.isfile(test_program):
-            raise Exception('pbes2lts-sym not found.')
-
-    def find_path(self):
-        path = run_simple_command('which pbes2lts-sym')
-        ltsmin_dir = os.path.dirname(os.path.abspath(path))
-        print >> sys.stderr, 'Found ltsmin binary in path:', path,
-        return ltsmin_dir
+        self.adaptive_timeout = config.get('adaptive_timeout')
+        self.memory_limit = config.get('memory_limit')
+        self.timeout = config.get('timeout', experiment_timeout)
+        self.repetition = config.get('repetition', {})
+        # created when runs are executed, see get_placement
+        self.placement = None
+        self.placement_options = config.get('placement')
+        self.configured_path = get_configured_path(config, 'ltsmin')
+        self.toolchain = get_toolchain_manifest(config)
+        self.store = ArtifactStore(config.get('store', 'store'))
+        self.queue_options = config.get('queue', {})
+        self.status_options = config.get('status', {})
+        self.compare_options = config.get('compare', {})
+        self.run_storage = None
+        run_storage = config.get('runs_storage')
+        if not run_storage is None:
+            self.run_storage = RunStorage(run_storage)
 
     def list(self, experiments):
         runs = []
@@ -385,7 +1041,7 @@ class Ltsmin(Tool):
             experiment_name = data['name']
             experiment_type = data['type']
             assert experiment_type in ['lps', 'pbes']
-            if experiment_type is 'lps':
+            if experiment_type == 'lps':
                 input_filename = data['lps_filename']
             else:
                 input_filename = data['pbes_filename']
@@ -395,13 +1051,16 @@ class Ltsmin(Tool):
             else:
                 n_cores = run_options['n_cores']
                 for n in n_cores:
-                    runs.append({
-                        'name': experiment_name,
-                        'type': experiment_type,
-                        'input': input_filename,
-                        'cores': n,
-                        'data': data
-                    })
+                    for options in get_option_combinations(run_options):
+                        runs.append({
+                            'name': get_variant_name(experiment_name, options),
+                            'experiment': experiment_name,
+                            'type': experiment_type,
+                            'input': input_filename,
+                            'cores': n,
+                            'options': options,
+                            'data': data
+                        })
         return runs
 
     def print_list(self, experiments):
@@ -413,17 +1072,102 @@ class Ltsmin(Tool):
     def report(self, action, result, output_dir):
         print >> sys.stderr, result
         result_file = '{}/{}.result'.format(output_dir, action)
-        with open(result_file, 'w') as f:
-            f.write(result + '\n')
+        write_atomic(result_file, result + '\n')
+
+    def report_metrics(self, action, tool, result, n_cores, output_dir):
+        metrics = parse_log('{}/{}.log'.format(output_dir, action)).get(tool, {})
+        metrics.update(result.get_metrics())
+        metrics['cores'] = n_cores
+        metrics_file = '{}/{}.metrics.json'.format(output_dir, action)
+        write_atomic(metrics_file, json.dumps(metrics, indent=4, sort_keys=True))
+
+    def report_options(self, options, output_dir):
+        options_file = '{}/options.json'.format(output_dir)
+        with open(options_file, 'w') as f:
+            json.dump(options, f, indent=4)
+
+    def report_toolchain(self, type, output_dir):
+        toolchain_file = '{}/toolchain.json'.format(output_dir)
+        with open(toolchain_file, 'w') as f:
+            json.dump(self.get_toolchain(self.run_programs[type]), f, indent=4, sort_keys=True)
+
+    def get_placement(self):
+        """
+        Returns the placement of runs, or None if no placement is configured.
+        The placement is created when it is needed for the first time, such
+        that actions that do not execute runs do not inspect the machine.
+        """
+        if self.placement is None and not self.placement_options is None:
+            options = self.placement_options
+            self.placement = Placement(options.get('mode', 'compact'), options.get('membind', False))
+        return self.placement
+
+    def report_placement(self, cpus, output_dir):
+        placement_file = '{}/placement.json'.format(output_dir)
+        with open(placement_file, 'w') as f:
+            json.dump(self.get_placement().describe(cpus), f, indent=4, sort_keys=True)
+
+    def lps_explore(self, action, tool, command, input_lps, n_cores, output_dir, timeout, memory_limit = None):
+        # redirect log messages
+        logfile = '{}/{}.log'.format(output_dir, action)
+        try:
+            print >> sys.stderr, ''
+            start = time.time()
+
+            result = run_command('Exploring ' + input_lps + ' with ' + tool, command, logfile=logfile,
+                                 timeout=timeout, progress=ProgressMonitor(tool), memory_limit=memory_limit)
 
-    def lps_instantiate(self, input_lps, n_cores, output_dir):
-        raise Exception('not implemented yet.')
+            # the times at which the command started and exited
+            (start, end) = (result.start, result.end)
+            if result.out_of_memory:
+                self.report(action, 'Out of memory after {:.2f} seconds.'.format((end - start)), output_dir)
+            elif not result.timeout:
+                self.report(action, 'Exploring took {:.2f} seconds.'.format((end - start)), output_dir)
+            else:
+                self.report(action, 'Timeout after {:.2f} seconds.'.format((end - start)), output_dir)
+            self.report_metrics(action, tool, result, n_cores, output_dir)
+            return result
+
+        except Exception as e:
+            print >> sys.stderr, 'Error:', e
+            sys.exit(1)
 
-    def pbes_instantiate(self, input_pbes, output_spg, n_cores, output_dir):
+    def lps_instantiate(self, input_lps, n_cores, output_dir, timeouts = None, prefix = '',
+                        options = run_option_defaults, memory_limit = None):
+        """
+        Explores the state space of the LPS with the symbolic tool
+        lps2lts-sym and with the explicit multi-core tool lps2lts-mc.
+        The explorations are independent: both run, also if one times out.
+        """
+        if timeouts is None:
+            timeouts = {}
+        # lps2lts-sym
+        sym_options = '--mcrl2-rewriter={rewriter} -r{regroup} --vset={vset} --order={order}'.format(**options)
+        lace_options = '--lace-workers={}'.format(n_cores)
+        command = prefix + self.get_path() + 'lps2lts-sym {sym_options} {lace_options} {input_lps}'.format(
+            sym_options = sym_options,
+            lace_options = lace_options,
+            input_lps = input_lps
+        )
+        self.lps_explore('lps2lts-sym', 'lps2lts-sym', command, input_lps, n_cores, output_dir,
+                         timeouts.get('lps2lts-sym', experiment_timeout), memory_limit)
+        # lps2lts-mc
+        mc_options = '--mcrl2-rewriter={rewriter}'.format(**options)
+        thread_options = '--threads={}'.format(n_cores)
+        command = prefix + self.get_path() + 'lps2lts-mc {mc_options} {thread_options} {input_lps}'.format(
+            mc_options = mc_options,
+            thread_options = thread_options,
+            input_lps = input_lps
+        )
+        self.lps_explore('lps2lts-mc', 'lps2lts-mc', command, input_lps, n_cores, output_dir,
+                         timeouts.get('lps2lts-mc', experiment_timeout), memory_limit)
+
+    def pbes_instantiate(self, input_pbes, output_spg, n_cores, output_dir, timeout = experiment_timeout,
+                         prefix = '', options = run_option_defaults, memory_limit = None):
         # pbes2lts-sym
-        pbes2lts_options = '--mcrl2-rewriter=jitty -rgs --vset=lddmc --order=par-prev'
+        pbes2lts_options = '--mcrl2-rewriter={rewriter} -r{regroup} --vset={vset} --order={order}'.format(**options)
         lace_options = '--lace-workers={}'.format(n_cores)
-        command = self.path + 'pbes2lts-sym {pbes2lts_options} {lace_options} {input_pbes} --pg-write={output_spg}'.format(
+        command = prefix + self.get_path() + 'pbes2lts-sym {pbes2lts_options} {lace_options} {input_pbes} --pg-write={output_spg}'.format(
             pbes2lts_options = pbes2lts_options,
             input_pbes = input_pbes,
             output_spg = output_spg,
@@ -435,24 +1179,74 @@ class Ltsmin(Tool):
             print >> sys.stderr, ''
             start = time.time()
 
-            success = run_command('Instantiating ' + input_pbes, command, logfile=logfile, timeout=experiment_timeout)
+            result = run_command('Instantiating ' + input_pbes, command, logfile=logfile, timeout=timeout,
+                                 progress=ProgressMonitor('pbes2lts-sym'), memory_limit=memory_limit)
 
-            end = time.time()
-            if success:
+            # the times at which the command started and exited
+            (start, end) = (result.start, result.end)
+            if result.out_of_memory:
+                self.report('pbes2spg', 'Out of memory after {:.2f} seconds.'.format((end - start)), output_dir)
+            elif not result.timeout:
                 self.report('pbes2spg', 'Instantiating took {:.2f} seconds.'.format((end - start)), output_dir)
             else:
                 self.report('pbes2spg', 'Timeout after {:.2f} seconds.'.format((end - start)), output_dir)
+            self.report_metrics('pbes2spg', 'pbes2lts-sym', result, n_cores, output_dir)
+            return result
         except Exception as e:
             print >> sys.stderr, 'Error:', e
             if os.path.isfile(output_spg):
                 os.remove(output_spg)
             sys.exit(1)
 
-    def pbes_solve(self, input_spg, n_cores, output_dir):
+    def get_spg_key(self, input_pbes, options):
+        return get_key(
+            'spg',
+            file_checksum(input_pbes),
+            [options[option] for option in ['rewriter', 'regroup', 'vset', 'order']],
+            self.get_toolchain(['pbes2lts-sym'])['pbes2lts-sym']['version']
+        )
+
+    def pbes_instantiate_stored(self, input_pbes, output_spg, n_cores, output_dir, timeout = experiment_timeout,
+                                prefix = '', options = run_option_defaults, memory_limit = None):
+        """
+        Links output_spg to the stored parity game for the PBES and the
+        instantiation options, instantiating and storing the game if it is
+        not in the store yet. Only the run that instantiates the game reports
+        a pbes2spg result; other runs write a pbes2spg.cached file that refers
+        to the stored game. Returns the result of the instantiation, or None
+        if the stored game is used.
+        """
+        key = self.get_spg_key(input_pbes, options)
+        # prevents concurrent runs from instantiating the same game
+        with self.store.locked(key):
+            object_filename = self.store.lookup(key)
+            if object_filename is None:
+                result = self.pbes_instantiate(input_pbes, output_spg, n_cores, output_dir, timeout, prefix, options,
+                                               memory_limit)
+                if result.timeout or result.out_of_memory:
+                    return result
+                object_filename = self.store.add(key, output_spg, '.spg', {
+                    'name': output_spg,
+                    'input': input_pbes,
+                    'options': options,
+                    'cores': n_cores,
+                    'time': result.end - result.start,
+                    'run_dir': output_dir
+                })
+                self.store.link(object_filename, output_spg)
+                return result
+        print >> sys.stderr, 'Using stored parity game:', object_filename
+        self.store.link(object_filename, output_spg)
+        with open('{}/pbes2spg.cached'.format(output_dir), 'w') as f:
+            json.dump({'key': key, 'path': object_filename}, f, indent=4, sort_keys=True)
+        return None
+
+    def pbes_solve(self, input_spg, n_cores, output_dir, timeout = experiment_timeout, prefix = '',
+                   options = run_option_defaults, memory_limit = None):
         # spgsolver
-        spgsolver_options = '--attr=par'
+        spgsolver_options = '--attr={attr}'.format(**options)
         lace_options = '--lace-workers={}'.format(n_cores)
-        command = self.path + 'spgsolver {spgsolver_options} {lace_options} {input_spg}'.format(
+        command = prefix + self.get_path() + 'spgsolver {spgsolver_options} {lace_options} {input_spg}'.format(
             spgsolver_options = spgsolver_options,
             input_spg = input_spg,
             lace_options = lace_options
@@ -463,91 +1257,631 @@ class Ltsmin(Tool):
             print >> sys.stderr, ''
             start = time.time()
 
-            success = run_command('Solving ' + input_spg, command, logfile=logfile, timeout=experiment_timeout)
+            result = run_command('Solving ' + input_spg, command, logfile=logfile, timeout=timeout,
+                                 progress=ProgressMonitor('spgsolver'), memory_limit=memory_limit)
 
-            end = time.time()
-            if (success):
+            # the times at which the command started and exited
+            (start, end) = (result.start, result.end)
+            if result.out_of_memory:
+                self.report('spgsolver', 'Out of memory after {:.2f} seconds.'.format((end - start)), output_dir)
+            elif not result.timeout:
                 self.report('spgsolver', 'Solving took {:.2f} seconds.'.format((end - start)), output_dir)
             else:
                 self.report('spgsolver', 'Timeout after {:.2f} seconds.'.format((end - start)), output_dir)
+            self.report_metrics('spgsolver', 'spgsolver', result, n_cores, output_dir)
+            return result
 
         except Exception as e:
             print >> sys.stderr, 'Error:', e
             sys.exit(1)
 
-    def run(self, experiments, index):
+    def get_configured_timeout(self, run):
+        """
+        Returns the 'timeout' run option of the experiment, or the 'timeout'
+        in the config file (default: experiment_timeout seconds).
+        """
+        return run['data'].get('run_options', {}).get('timeout', self.timeout)
+
+    def get_timeout(self, index, run, action):
+        """
+        Returns the timeout for an action of a run: the configured timeout
+        of the run. With an adaptive timeout policy, the timeout is capped at
+        a multiple ('factor') of the median time of previous runs, if there
+        are at least 'min_history' of those.
+        """
+        timeout = self.get_configured_timeout(run)
+        policy = self.adaptive_timeout
+        if policy is None:
+            return timeout
+        results = index.get_results(run['name'], run['cores'], action)
+        times = [t for (status, t) in results if status == 'done']
+        if len(times) >= policy.get('min_history', 3):
+            limit = policy.get('factor', 3.0) * numpy.median(times)
+            if limit < timeout:
+                print >> sys.stderr, 'Timeout for {} capped at {:.2f} seconds ({} previous runs).'.format(
+                    action, limit, len(times))
+                timeout = limit
+        return timeout
+
+    def get_memory_limit(self, run):
+        """
+        Returns the limit in megabytes on the resident memory of the tools
+        of a run: the 'memory_limit' run option of the experiment, or the
+        global memory limit. Returns None if the memory is not limited.
+        """
+        return run['data'].get('run_options', {}).get('memory_limit', self.memory_limit)
+
+    def is_hopeless(self, index, run):
+        """
+        With an adaptive timeout policy, a run is hopeless if it has timed
+        out or run out of memory in all of at least 'max_timeouts' previous runs.
+        """
+        policy = self.adaptive_timeout
+        actions = self.run_actions[run['type']]
+        if policy is None or len(actions) == 0:
+            return False
+        action = actions[0]
+        results = index.get_results(run['name'], run['cores'], action)
+        timeouts = len([status for (status, t) in results if status in ['timeout', 'memory']])
+        return timeouts >= policy.get('max_timeouts', 3) and timeouts == len(results)
+
+    def execute(self, run, cpus = None):
+        """
+        Executes a single run from the list of runs. With a placement
+        policy, the tools run on the given CPUs, or on CPUs allocated
+        for this run only if none are given.
+        """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S%f')
-        runs = self.list(experiments)
-        if index > len(runs):
-            print >> sys.stderr, 'Choose a number between 1 and', len(runs), '( was:', index, ')'
-            raise Exception('Index out of bounds.')
-        run = runs[index - 1]
         name = run['name']
         type = run['type']
         input_filename = run['input']
         cores = run['cores']
         assert type in ['lps', 'pbes']
+        index = ResultsIndex()
+        if not self.adaptive_timeout is None:
+            index.update(get_run_dirs(name, cores), name, cores, self.run_actions[type])
+        if self.is_hopeless(index, run):
+            print >> sys.stderr, 'Skipping run', name, cores, 'because all previous runs timed out or ran out of memory.'
+            return
+        output_dir = prepare_output_dir(name, cores, timestamp)
+        journal = Journal()
+        journal.start(name, cores, output_dir)
+        self.report_toolchain(type, output_dir)
+        self.report_options(run['options'], output_dir)
+        prefix = ''
+        placement = self.get_placement()
+        if not placement is None:
+            if cpus is None:
+                cpus = placement.allocate(cores)
+                if cpus is None:
+                    raise Exception('Cannot place {} cores in placement mode {}.'.format(cores, placement.mode))
+            prefix = placement.get_prefix(cpus)
+            print >> sys.stderr, 'Running on CPUs', format_cpu_list(cpus)
+            self.report_placement(cpus, output_dir)
+        memory_limit = self.get_memory_limit(run)
         if type == 'lps':
-            output_dir = prepare_output_dir(name, cores, timestamp)
-            self.lps_instantiate(input_filename, cores, output_dir)
+            timeouts = dict((action, self.get_timeout(index, run, action)) for action in self.run_actions[type])
+            self.lps_instantiate(input_filename, cores, output_dir, timeouts, prefix, run['options'], memory_limit)
         else:
-            output_dir = prepare_output_dir(name, cores, timestamp)
             spg_filename = '{}/{}.spg'.format(output_dir, name)
-            self.pbes_instantiate(input_filename, spg_filename, cores, output_dir)
-            self.pbes_solve(spg_filename, cores, output_dir)
+            if self.reuses_spg(run):
+                instantiate = self.pbes_instantiate_stored
+            else:
+                instantiate = self.pbes_instantiate
+            result = instantiate(input_filename, spg_filename, cores, output_dir,
+                                 self.get_timeout(index, run, 'pbes2spg'), prefix, run['options'], memory_limit)
+            if not result is None and (result.timeout or result.out_of_memory):
+                print >> sys.stderr, 'Not solving the incomplete parity game.'
+            else:
+                self.pbes_solve(spg_filename, cores, output_dir, self.get_timeout(index, run, 'spgsolver'), prefix,
+                                run['options'], memory_limit)
+        index.register(output_dir, name, cores, self.run_actions[type])
+        journal.complete(name, cores, output_dir)
+        if not self.run_storage is None:
+            self.run_storage.process([output_dir], self.get_evictable_run_dirs())
 
-    def analyse(self, experiments):
-        pbes2spg_summaries = []
-        spgsolver_summaries = []
+    def run(self, experiments, index):
+        runs = self.list(experiments)
+        if index > len(runs):
+            print >> sys.stderr, 'Choose a number between 1 and', len(runs), '( was:', index, ')'
+            raise Exception('Index out of bounds.')
+        self.execute(runs[index - 1])
+
+    def run_all(self, experiments, repetitions, max_cores = None):
+        """
+        Executes all runs the given number of times, running as many
+        runs concurrently as fit in the core budget.
+        """
+        runs = self.list(experiments)
+        self.plan(experiments, runs, repetitions)
+        scheduler = Scheduler(max_cores, placement = self.get_placement())
+        for i in range(repetitions):
+            for run in runs:
+                label = '{} {} ({} cores, repetition {})'.format(run['type'], run['name'], run['cores'], i + 1)
+                scheduler.add(Job(label, self.execute, (run,), run['cores']))
+        failed = scheduler.run()
+        if len(failed) > 0:
+            raise Exception('{} runs failed.'.format(len(failed)))
+
+    def get_evictable_run_dirs(self):
+        """
+        Returns the run directories of which bulky files may be evicted:
+        the runs that are complete in the results index and that the
+        journal does not report as active.
+        """
+        journal = Journal()
+        (targets, started) = journal.get_state()
+        active = set(event['run_dir'] for event in started if journal.is_active(event))
+        return [run_dir for run_dir in ResultsIndex().get_complete_run_dirs() if not run_dir in active]
+
+    def plan(self, experiments, runs, repetitions):
+        """
+        Records in the journal that every run should reach the number of
+        complete repetitions it has now, plus the given number.
+        """
+        index = self.update_index(experiments)
+        journal = Journal()
+        for run in runs:
+            target = index.count_complete(run['name'], run['cores']) + repetitions
+            journal.plan(run['name'], run['cores'], target)
+
+    def quarantine(self, run_dir):
+        """
+        Moves a partial run directory out of the runs tree.
+        """
+        destination = os.path.join('runs', '.quarantine', os.path.relpath(run_dir, 'runs'))
+        parent = os.path.dirname(destination)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        shutil.move(run_dir, destination)
+        print >> sys.stderr, 'Quarantined', run_dir, 'to', destination
+        return destination
+
+    def resume(self, experiments, max_cores = None):
+        """
+        Resumes an interrupted campaign: quarantines the directories of runs
+        that were started but did not complete, and executes the missing
+        repetitions until every run reaches the target of the journal.
+        Runs that are complete in the results index are kept, also if the
+        journal has no record of their completion.
+        """
+        journal = Journal()
+        (targets, started) = journal.get_state()
+        runs = self.list(experiments)
+        listed = set((run['name'], run['cores']) for run in runs)
+        index = self.update_index(experiments)
+        active = set()
+        for event in started:
+            run_dir = event['run_dir']
+            if journal.is_active(event):
+                active.add(run_dir)
+            elif index.is_complete(run_dir):
+                # the run was registered, but stopped before it was journaled as complete
+                journal.complete(event['name'], event['cores'], run_dir)
+            elif os.path.isdir(run_dir) and (event['name'], event['cores']) in listed:
+                destination = self.quarantine(run_dir)
+                journal.quarantine(event['name'], event['cores'], run_dir, destination)
+        # partial directories from before the journal, or with unreadable results
+        for run in runs:
+            for run_dir in get_run_dirs(run['name'], run['cores']):
+                if not index.is_complete(run_dir) and not run_dir in active:
+                    destination = self.quarantine(run_dir)
+                    journal.quarantine(run['name'], run['cores'], run_dir, destination)
+        index = self.update_index(experiments)
+        scheduler = Scheduler(max_cores, placement = self.get_placement())
+        rows = []
+        for run in runs:
+            name = run['name']
+            cores = run['cores']
+            target = targets.get((name, cores))
+            if target is None:
+                continue
+            complete = index.count_complete(name, cores)
+            running = len([e for e in started if e['run_dir'] in active and e['name'] == name and e['cores'] == cores])
+            missing = max(0, target - complete - running)
+            rows.append([name, cores, target, complete, running, missing])
+            for i in range(missing):
+                label = '{} {} ({} cores, resumed {} of {})'.format(run['type'], name, cores, i + 1, missing)
+                scheduler.add(Job(label, self.execute, (run,), cores))
+        print(tables.format_pretty_table(rows, ['name', 'cores', 'target', 'complete', 'running', 'missing']))
+        failed = scheduler.run()
+        if len(failed) > 0:
+            raise Exception('{} runs failed.'.format(len(failed)))
+
+    def reuses_spg(self, run):
+        return run['type'] == 'pbes' and run['data'].get('run_options', {}).get('reuse_spg', False)
+
+    def get_measured_actions(self, run):
+        """
+        Returns the actions that are measured in every repetition of a run:
+        with a stored parity game, only the solver.
+        """
+        actions = self.run_actions[run['type']]
+        if self.reuses_spg(run):
+            return [action for action in actions if action != 'pbes2spg']
+        return actions
+
+    def get_repetition_status(self, index, run):
+        """
+        Decides if a run needs another repetition: until it has
+        'min_repetitions' results and the confidence interval of the mean
+        time of each action is narrower than 'target' times the mean.
+        Runs stop early after 'max_repetitions' repetitions, after 'max_time'
+        seconds in total, or when most repetitions timed out.
+        """
+        policy = self.repetition
+        actions = self.run_actions[run['type']]
+        if self.is_hopeless(index, run):
+            return 'timeouts'
+        results = dict((action, index.get_results(run['name'], run['cores'], action)) for action in actions)
+        measured = self.get_measured_actions(run)
+        if max(len(results[action]) for action in actions) >= policy.get('max_repetitions', 30):
+            return 'max repetitions'
+        if sum(t for action in actions for (status, t) in results[action]) >= policy.get('max_time', experiment_timeout):
+            return 'max time'
+        if len(results[measured[0]]) < policy.get('min_repetitions', 3):
+            return 'pending'
+        for action in measured:
+            times = [t for (status, t) in results[action] if status == 'done']
+            if len(times) == 0 and action != measured[0]:
+                continue
+            if 2 * len(times) < len(results[action]):
+                return 'timeouts'
+            width = relative_width(times)
+            if width is None or width > policy.get('target', 0.05):
+                return 'pending'
+        return 'converged'
+
+    def run_adaptive(self, experiments, max_cores = None):
+        """
+        Repeats the runs in rounds, scheduling another repetition only for
+        runs of which the mean times are not yet known precisely enough.
+        Stops when all runs are done, or after 'max_session_time' seconds.
+        """
+        runs = self.list(experiments)
+        max_session_time = self.repetition.get('max_session_time')
+        start = time.time()
+        round = 0
+        while True:
+            index = self.update_index(experiments)
+            statuses = [self.get_repetition_status(index, run) for run in runs]
+            pending = [run for (run, status) in zip(runs, statuses) if status == 'pending']
+            if len(pending) == 0:
+                break
+            if not max_session_time is None and time.time() - start >= max_session_time:
+                print >> sys.stderr, 'Session time of {} seconds exceeded.'.format(max_session_time)
+                break
+            round += 1
+            print >> sys.stderr, 'Round {}: repeating {} of {} runs.'.format(round, len(pending), len(runs))
+            scheduler = Scheduler(max_cores, placement = self.get_placement())
+            for run in pending:
+                label = '{} {} ({} cores, round {})'.format(run['type'], run['name'], run['cores'], round)
+                scheduler.add(Job(label, self.execute, (run,), run['cores']))
+            failed = scheduler.run()
+            if len(failed) > 0:
+                raise Exception('{} runs failed.'.format(len(failed)))
+        rows = []
+        for (run, status) in zip(runs, statuses):
+            actions = self.run_actions[run['type']]
+            n = len(index.get_results(run['name'], run['cores'], actions[0]))
+            rows.append([run['name'], run['cores'], n, status])
+        print(tables.format_pretty_table(rows, ['name', 'cores', 'n', 'status']))
+
+    def get_work_queue(self):
+        return WorkQueue(self.queue_options.get('path', 'runs/queue.sqlite'),
+                         self.queue_options.get('max_attempts', 3))
+
+    def enqueue(self, experiments, repetitions):
+        """
+        Adds all runs the given number of times to the work queue.
+        """
+        runs = self.list(experiments)
+        self.plan(experiments, runs, repetitions)
+        n = self.get_work_queue().enqueue(runs, repetitions)
+        print >> sys.stderr, 'Enqueued {} jobs.'.format(n)
+
+    def print_queue(self):
+        statuses = ['pending', 'leased', 'done', 'failed']
+        counts = OrderedDict()
+        for (name, cores, status, count) in self.get_work_queue().get_status():
+            counts.setdefault((name, cores), dict((s, 0) for s in statuses))[status] = count
+        rows = [[name, cores] + [c[s] for s in statuses] for ((name, cores), c) in counts.items()]
+        print(tables.format_pretty_table(rows, ['name', 'cores'] + statuses))
+
+    def monitor(self, port = None):
+        """
+        Publishes the status of the active runs in the file given by the
+        'path' of the 'status' section in the config, every 'interval'
+        seconds, and over HTTP if a port is given (or configured).
+        """
+        options = self.status_options
+        if port is None:
+            port = options.get('port')
+        monitor = StatusMonitor(self.run_actions, options.get('path', 'runs/status.json'),
+                                options.get('interval', 5))
+        monitor.run(port)
+
+    def work(self, experiments, max_cores = None):
+        """
+        Executes jobs from the work queue until it is drained, running as
+        many jobs concurrently as fit in the core budget. The leases of the
+        jobs are renewed every 'heartbeat_interval' seconds. Several workers,
+        on one or more machines, can work on the same queue.
+        """
+        queue = self.get_work_queue()
+        lease_time = self.queue_options.get('lease_time', 600)
+        heartbeat_interval = self.queue_options.get('heartbeat_interval', 60)
+        idle_interval = self.queue_options.get('poll_interval', 10)
+        worker = get_worker_id()
+        runs = self.list(experiments)
+        scheduler = Scheduler(max_cores, placement = self.get_placement())
+        print >> sys.stderr, 'Worker {} started with {} cores.'.format(worker, scheduler.max_cores)
+        last_heartbeat = time.time()
+        try:
+            while True:
+                # lease jobs while there are free cores
+                while len(scheduler.pending) == 0 and scheduler.used_cores() < scheduler.max_cores:
+                    row = queue.lease(worker, lease_time, scheduler.max_cores - scheduler.used_cores())
+                    if row is None:
+                        break
+                    (job_id, run_index, name, cores) = row
+                    run = None
+                    if run_index <= len(runs):
+                        run = runs[run_index - 1]
+                    if run is None or run['name'] != name or run['cores'] != cores:
+                        print >> sys.stderr, 'Job {} does not match the experiments file.'.format(job_id)
+                        queue.finish(job_id, worker, False)
+                        continue
+                    job = Job('{} {} ({} cores, job {})'.format(run['type'], name, cores, job_id),
+                              self.execute, (run,), cores)
+                    job.queue_id = job_id
+                    scheduler.add(job)
+                scheduler.start_pending()
+                if len(scheduler.active) == 0 and len(scheduler.pending) == 0:
+                    if queue.is_drained():
+                        break
+                    # jobs of other workers may return to the queue
+                    time.sleep(idle_interval)
+                    continue
+                time.sleep(scheduler.poll_interval)
+                n = len(scheduler.finished)
+                scheduler.reap()
+                for job in scheduler.finished[n:]:
+                    queue.finish(job.queue_id, worker, job.exitcode == 0)
+                if time.time() - last_heartbeat >= heartbeat_interval:
+                    for job in scheduler.active + scheduler.pending:
+                        if not queue.heartbeat(job.queue_id, worker, lease_time):
+                            print >> sys.stderr, 'Lost the lease of', job.label
+                    last_heartbeat = time.time()
+        except KeyboardInterrupt:
+            # the leases expire and the jobs return to the queue
+            for job in scheduler.active:
+                job.process.terminate()
+            raise
+        failed = [job for job in scheduler.finished if not job.exitcode == 0]
+        print >> sys.stderr, 'Worker {} finished {} jobs ({} failed).'.format(
+            worker, len(scheduler.finished), len(failed))
+
+    def update_index(self, experiments):
+        """
+        Adds the results of runs that are not in the index yet.
+        """
+        index = ResultsIndex()
+        for run in self.list(experiments):
+            name = run['name']
+            cores = run['cores']
+            n = index.update(get_run_dirs(name, cores), name, cores, self.run_actions[run['type']])
+            if n > 0:
+                print >> sys.stderr, 'Indexed {} directories for run'.format(n), name, cores
+        return index
+
+    def compact(self, experiments):
+        """
+        Compresses and deduplicates the bulky files of all complete runs,
+        and enforces the quota of the runs directory.
+        """
+        index = self.update_index(experiments)
+        run_dirs = []
+        for run in self.list(experiments):
+            run_dirs += [d for d in get_run_dirs(run['name'], run['cores']) if index.is_complete(d)]
+        run_storage = self.run_storage
+        if run_storage is None:
+            run_storage = RunStorage({})
+        run_storage.process(run_dirs, self.get_evictable_run_dirs())
+
+    def analyse(self, experiments, output_filename = None):
+        """
+        Prints summaries of the results per action, and the speedup and
+        parallel efficiency relative to the run with the fewest cores.
+        The speedups can be written to a CSV or JSON file for plotting.
+        """
+        actions = self.run_actions['pbes'] + self.run_actions['lps']
+        summaries = dict((action, []) for action in actions)
+        speedups = dict((action, []) for action in actions)
+        observations = dict((action, OrderedDict()) for action in actions)
+        configurations = dict((action, OrderedDict()) for action in actions)
+        resource_summaries = dict((action, []) for action in actions)
+        throughput_summaries = dict((action, []) for action in actions)
+        index = self.update_index(experiments)
         runs = self.list(experiments)
         for run in runs:
             type = run['type']
             name = run['name']
             cores = run['cores']
             print >> sys.stderr, "Analysing results for run", name
-            pbes2spg_times = []
-            pbes2spg_timeouts = 0
-            spgsolver_times = []
-            spgsolver_timeouts = 0
-            for d in get_run_dirs(name, cores):
-                if is_pbes2spg_run(d):
-                    if is_pbes2spg_timeout(d):
-                        pbes2spg_timeouts += 1
-                    else:
-                        t1 = get_pbes2spg_time(d)
-                        if t1 is None:
-                            raise Exception('No instantiation time found for run ' + d)
-                        pbes2spg_times.append(t1)
-                if is_spgsolver_run(d):
-                    if is_spgsolver_timeout(d):
-                        spgsolver_timeouts += 1
-                    else:
-                        t2 = get_spgsolver_time(d)
-                        if t2 is None:
-                            raise Exception('No solving time found for run ' + d)
-                        spgsolver_times.append(t2)
-            if len(pbes2spg_times) > 0 or pbes2spg_timeouts > 0:
-                summary = get_summary([name, cores, pbes2spg_timeouts], pbes2spg_times)
-                pbes2spg_summaries.append(summary)
-            if len(spgsolver_times) > 0 or spgsolver_timeouts > 0:
-                summary = get_summary([name, cores, spgsolver_timeouts], spgsolver_times)
-                spgsolver_summaries.append(summary)
-        column_names = ['name', 'cores', 'timeouts', 'n', 'mean', 'stdev']
-        print
-        print 'pbes2spg'
-        print(tables.format_pretty_table(pbes2spg_summaries, column_names))
+            for action in self.run_actions[type]:
+                results = index.get_results(name, cores, action)
+                if len(results) > 0:
+                    observations[action].setdefault(name, {})[cores] = get_observations(results)
+                    configurations[action].setdefault((run['experiment'], cores), []).append(
+                        (get_options_label(run['options']), get_observations(results)))
+                times = [t for (status, t) in results if status == 'done']
+                timeouts = len([status for (status, t) in results if status == 'timeout'])
+                memory_outs = len([status for (status, t) in results if status == 'memory'])
+                if len(results) > 0:
+                    summary = get_summary([name, cores, timeouts, memory_outs], times)
+                    summaries[action].append(summary)
+                    metrics = index.get_metrics(name, cores, action)
+                    summary = get_resource_summary([name, cores], metrics, cores)
+                    resource_summaries[action].append(summary)
+                    summary = get_throughput_summary([name, cores], metrics)
+                    if not summary is None:
+                        throughput_summaries[action].append(summary)
+        column_names = ['name', 'cores', 'timeouts', 'out of memory', 'n', 'mean', 'stdev']
+        resource_column_names = ['name', 'cores', 'n', 'user', 'system', 'max rss (MB)',
+                                 'vol. switches', 'invol. switches', 'cpu utilisation']
+        throughput_column_names = ['name', 'cores', 'n', 'states', 'nodes', 'states/s', 'nodes/s']
+        speedup_column_names = ['name', 'cores', 'n/timeouts', 'base median', 'median',
+                                'speedup', '95% CI', 'efficiency', '95% CI']
+        ranking_column_names = ['experiment', 'cores', 'rank', 'options', 'n', 'timeouts', 'median', 'relative']
+        for action in actions:
+            if len(summaries[action]) == 0:
+                continue
+            print
+            print action
+            print(tables.format_pretty_table(summaries[action], column_names))
+            print(tables.format_pretty_table(resource_summaries[action], resource_column_names))
+            if len(throughput_summaries[action]) > 0:
+                print(tables.format_pretty_table(throughput_summaries[action], throughput_column_names))
+            for name, cores_observations in observations[action].items():
+                speedups[action] += get_speedups(name, action, cores_observations)
+            if len(speedups[action]) > 0:
+                print(tables.format_pretty_table([get_speedup_summary(r) for r in speedups[action]],
+                                                 speedup_column_names))
+            ranking = []
+            for (experiment, cores), group in configurations[action].items():
+                if len(group) > 1:
+                    ranking += get_ranking(experiment, cores, group)
+            if len(ranking) > 0:
+                print(tables.format_pretty_table(ranking, ranking_column_names))
+        if not output_filename is None:
+            write_records(output_filename, [r for action in actions for r in speedups[action]])
+
+    def compare(self, experiments, baseline, candidate, output_filename = None):
+        """
+        Compares the times of two result sets, e.g., of two builds of the
+        tools, per run and action. A result set is a directory with the
+        layout of the runs directory, or the runs of which a program path or
+        version in toolchain.json contains the given text. The p-values of
+        the Mann-Whitney U test are adjusted for the number of comparisons
+        (Holm); a difference is significant if the adjusted p-value is below
+        'alpha' and Cliff's delta is at least 'min_delta' (see the 'compare'
+        section in the config). Returns the number of significant slowdowns.
+        """
+        alpha = self.compare_options.get('alpha', 0.05)
+        min_delta = self.compare_options.get('min_delta', 0.147)
+        records = []
+        for run in self.list(experiments):
+            name = run['name']
+            cores = run['cores']
+            base_dirs = select_run_dirs(baseline, name, cores)
+            run_dirs = select_run_dirs(candidate, name, cores)
+            for action in self.run_actions[run['type']]:
+                base_results = read_results(base_dirs, action)
+                results = read_results(run_dirs, action)
+                if len(base_results) == 0 and len(results) == 0:
+                    continue
+                records.append(get_comparison(name, cores, action, base_results, results))
+        adjusted = holm([record['p'] for record in records])
+        for (record, p) in zip(records, adjusted):
+            record['p_adjusted'] = p
+            verdict = None
+            if not p is None and p < alpha and abs(record['delta']) >= min_delta:
+                verdict = 'slower' if record['delta'] > 0 else 'faster'
+            record['verdict'] = verdict
+        column_names = ['name', 'cores', 'base n/timeouts', 'n/timeouts', 'base median', 'median',
+                        'ratio', 'p', 'adjusted p', 'delta', 'verdict']
+        print >> sys.stderr, 'Baseline:', baseline
+        print >> sys.stderr, 'Candidate:', candidate
+        for action in self.run_actions['pbes'] + self.run_actions['lps']:
+            rows = [get_comparison_summary(r) for r in records if r['action'] == action]
+            if len(rows) == 0:
+                continue
+            print
+            print action
+            print(tables.format_pretty_table(rows, column_names))
+        if not output_filename is None:
+            write_records(output_filename, records)
+        slowdowns = len([r for r in records if r['verdict'] == 'slower'])
+        if slowdowns > 0:
+            print >> sys.stderr, '{} significant slowdowns (alpha = {}).'.format(slowdowns, alpha)
+        return slowdowns
+
+    def fit(self, experiments, time_budget = None, memory_budget = None):
+        """
+        Fits the growth of the median time and peak memory of every action to
+        the size of the experiments of a scaling suite, and predicts the
+        size at which the budgets (seconds, megabytes) will be exceeded.
+        Without a time budget, the budget of each series is the configured
+        timeout of its runs.
+        """
+        if memory_budget is None:
+            memory_budget = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1048576.0
+        index = self.update_index(experiments)
+        series = OrderedDict()
+        for run in self.list(experiments):
+            scaling = run['data'].get('scaling')
+            if scaling is None:
+                continue
+            name = run['name']
+            cores = run['cores']
+            for action in self.run_actions[run['type']]:
+                key = (scaling['family'], scaling['property'], get_options_label(run['options']), cores, action)
+                # timeouts count as at least the time limit
+                (median, censored) = censored_median(get_observations(index.get_results(name, cores, action)))
+                metrics = [m for m in index.get_metrics(name, cores, action) if 'max_rss' in m]
+                data = series.setdefault(key, {'time': [], 'memory': [], 'timeout': 0})
+                data['timeout'] = max(data['timeout'], self.get_configured_timeout(run))
+                if not median is None:
+                    data['time'].append((scaling['size'], median))
+                if len(metrics) > 0:
+                    data['memory'].append((scaling['size'], numpy.median([m['max_rss'] for m in metrics]) / 1024.0))
+        rows = []
+        for (family, property, options, cores, action), data in series.items():
+            timeout = data['timeout'] if time_budget is None else time_budget
+            for measure, budget in [('time', timeout), ('memory', memory_budget)]:
+                points = data[measure]
+                if len(points) < 2:
+                    continue
+                model = fit_growth([x for (x, y) in points], [y for (x, y) in points])
+                (kind, a, b, r2) = model
+                limit = predict_size(model, budget)
+                if not limit is None:
+                    limit = '{:.1f}'.format(limit)
+                rows.append([family, property, options, cores, action, measure, len(points), kind,
+                             '{:.3g}'.format(a), '{:.3g}'.format(b), '{:.3f}'.format(r2),
+                             '{:.0f}'.format(budget), limit])
+        column_names = ['family', 'property', 'options', 'cores', 'action', 'measure', 'sizes', 'model',
+                        'a', 'b', 'r2', 'budget', 'size at budget']
         print
-        print 'spgsolver'
-        print(tables.format_pretty_table(spgsolver_summaries, column_names))
+        print 'growth (exp: a * e^(b * size), power: a * size^b)'
+        print(tables.format_pretty_table(rows, column_names))
+
+
+class LazyTools(dict):
+    """
+    Dictionary of tools that creates a tool when it is first used.
+    """
+    def __init__(self, classes, config):
+        dict.__init__(self)
+        self.classes = classes
+        self.config = config
+
+    def __missing__(self, name):
+        tool = self.classes[name](self.config)
+        self[name] = tool
+        return tool
 
 
 class ToolRegistry:
 
+    classes = {
+        'mcrl2': Mcrl2,
+        'ltsmin': Ltsmin
+    }
+
     tools = {}
 
     def __init__(self, config):
-        self.tools = {
-            'mcrl2': Mcrl2(config),
-            'ltsmin': Ltsmin(config)
-        }
+        self.tools = LazyTools(self.classes, config)
 
@@ -0,0 +1,141 @@
+#! /usr/bin/env python
+# :noTabs=true:
+# (c) Copyright (c) 2017  Gijs Kant
+# (c) This file is distributed under the MIT License,
+# (c) see the file LICENSE.
+"""
+workqueue.py
+
+Brief: SQLite job queue, shared by workers on several machines.
+
+Author: Gijs Kant <gijskant@protonmail.com>
+
+"""
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+def get_worker_id():
+    return '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+class WorkQueue:
+    """
+    Queue of runs to execute. A worker leases a job for a limited time and
+    has to renew the lease with heartbeats while the job runs. Jobs of
+    which the lease expired, e.g., because the worker died, are returned to
+    the queue, at most 'max_attempts' times. The database can be on a
+    shared file system, as long as it supports POSIX locks.
+    """
+    def __init__(self, filename = 'runs/queue.sqlite', max_attempts = 3):
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.max_attempts = max_attempts
+        # transactions are started explicitly
+        self.connection = sqlite3.connect(filename, timeout=600, isolation_level=None)
+        self.create_tables()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block in a transaction that holds the write lock from the start.
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def create_tables(self):
+        with self.transaction():
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_index INTEGER,
+                name TEXT,
+                cores INTEGER,
+                repetition INTEGER,
+                status TEXT,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER,
+                enqueued REAL,
+                finished REAL
+            )''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+
+    def enqueue(self, runs, repetitions):
+        """
+        Adds every run the given number of times. A run is identified by
+        its index (starting at 1) in the list of runs, as for the 'run' action.
+        """
+        now = time.time()
+        with self.transaction():
+            for i in range(repetitions):
+                for (run_index, run) in enumerate(runs):
+                    self.connection.execute('''INSERT INTO jobs
+                        (run_index, name, cores, repetition, status, attempts, enqueued)
+                        VALUES (?, ?, ?, ?, 'pending', 0, ?)''',
+                        (run_index + 1, run['name'], run['cores'], i + 1, now))
+        return repetitions * len(runs)
+
+    def requeue_expired(self):
+        now = time.time()
+        self.connection.execute('''UPDATE jobs SET status = 'failed', worker = NULL, finished = ?
+            WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?''', (now, now, self.max_attempts))
+        self.connection.execute('''UPDATE jobs SET status = 'pending', worker = NULL
+            WHERE status = 'leased' AND lease_expires < ?''', (now,))
+
+    def lease(self, worker, lease_time, max_cores):
+        """
+        Leases the oldest pending job that needs at most max_cores cores.
+        Returns a tuple (id, run_index, name, cores), or None if there is
+        no such job.
+        """
+        with self.transaction():
+            self.requeue_expired()
+            row = self.connection.execute('''SELECT id, run_index, name, cores FROM jobs
+                WHERE status = 'pending' AND cores <= ?
+                ORDER BY id LIMIT 1''', (max_cores,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('''UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?,
+                attempts = attempts + 1 WHERE id = ?''', (worker, time.time() + lease_time, row[0]))
+        return row
+
+    def heartbeat(self, job_id, worker, lease_time):
+        """
+        Renews the lease of a job. Returns False if the worker has lost
+        the lease.
+        """
+        with self.transaction():
+            cursor = self.connection.execute('''UPDATE jobs SET lease_expires = ?
+                WHERE id = ? AND worker = ? AND status = 'leased' ''', (time.time() + lease_time, job_id, worker))
+        return cursor.rowcount == 1
+
+    def finish(self, job_id, worker, success):
+        with self.transaction():
+            self.connection.execute('''UPDATE jobs SET status = ?, finished = ?
+                WHERE id = ? AND worker = ? AND status = 'leased' ''',
+                ('done' if success else 'failed', time.time(), job_id, worker))
+
+    def is_drained(self):
+        """
+        Returns True if no job is pending or leased.
+        """
+        row = self.connection.execute('''SELECT COUNT(*) FROM jobs
+            WHERE status IN ('pending', 'leased')''').fetchone()
+        return row[0] == 0
+
+    def get_status(self):
+        """
+        Returns the number of jobs per run and status, as
+        (name, cores, status, count) tuples.
+        """
+        return self.connection.execute('''SELECT name, cores, status, COUNT(*) FROM jobs
+            GROUP BY name, cores, status ORDER BY name, cores, status''').fetchall()